@@ -0,0 +1,141 @@
+"""Times the checklist window's hot paths under Qt's offscreen platform.
+
+    python benchmarks/bench_app.py [--steps 10,500,5000] [--hosts 22,2000] [--json results.json]
+
+Each runbook size gets its own temporary directory with a synthetic
+steps.yaml, a cold checklist cache and a fresh autosave, so runs don't
+influence each other. Needs PyQt5 but no display.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from synthetic import make_notes, rack_lines, write_checklist, write_topology  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def per_call(func, items):
+    start = time.perf_counter()
+    count = 0
+    for item in items:
+        func(item)
+        count += 1
+    return (time.perf_counter() - start) / max(count, 1)
+
+
+def bench_runbook(app, n_steps, hosts):
+    import main
+    import topology
+    from PyQt5.QtCore import Qt
+
+    results = {}
+    checklist = write_checklist("steps.yaml", n_steps, seed=n_steps)
+    # The default layout stops at 22 hosts; a BENCH-{n} MTM per size makes save_text emit n entries
+    write_topology("topology.yaml", hosts)
+    topology.load_topologies.cache_clear()
+    steps = checklist['steps']
+    main_step_names = list(steps)
+
+    window = None
+
+    def create():
+        nonlocal window
+        window = main.MyApp()
+    results['startup cold ms'] = timed(create) * 1000
+    window.close()
+    results['startup cached ms'] = timed(create) * 1000
+    app.processEvents()
+
+    model = window.main_steps_model
+    while model.canFetchMore():
+        model.fetchMore()
+    sample = main_step_names[::max(1, len(main_step_names) // 200)]
+    results['step switch ms'] = per_call(lambda name: window.on_main_step_clicked(model.index(window.checklist.row(name))), sample) * 1000
+
+    toggles = [(name, i % len(steps[name])) for i, name in enumerate(sample)]
+    results['toggle ms'] = per_call(lambda args: window.on_checkbox_state_changed(args[0], args[1], Qt.Checked), toggles) * 1000
+
+    window.user_notes.update(make_notes(steps, seed=n_steps))
+    window.save_engine.mark_all_dirty()
+
+    def autosave_full():
+        window.auto_save(force=True)
+        window.persistence_worker.flush()
+    results['auto_save snapshot ms'] = timed(autosave_full) * 1000
+    window.on_checkbox_state_changed(sample[0], 0, Qt.Unchecked)
+    results['auto_save journal ms'] = timed(autosave_full) * 1000
+
+    session_file = window.save_engine.filename
+    results['load session ms'] = timed(lambda: window.load_session_from_file(session_file)) * 1000
+    window.persistence_worker.flush()
+
+    # Generator tabs are built on first open
+    window.tab_widget.setCurrentIndex(1)
+    window.tab_widget.setCurrentIndex(2)
+    window.tab_widget.setCurrentIndex(0)
+    window.rack_var = "a01-sr01-rk07"
+    for n_hosts in hosts:
+        window.mtm_var = f"BENCH-{n_hosts}"
+        macs, pws = rack_lines(7, n_hosts)
+        window.mac_input.setPlainText("\n".join(macs))
+        window.pw_input.setPlainText("\n".join(pws))
+        results[f'save_text {n_hosts} hosts ms'] = timed(window.save_text) * 1000
+        window.hostlist_input.setPlainText("\n".join(f"s{i:04d}" for i in range(n_hosts)))
+        window.mac1_input.setPlainText("\n".join(macs))
+        window.pw1_input.setPlainText("\n".join(pws))
+        results[f'save_1u_text {n_hosts} hosts ms'] = timed(window.save_1u_text) * 1000
+
+    window.close()
+    app.processEvents()
+    return results
+
+
+def run(steps, hosts):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    results = {}
+    cwd = os.getcwd()
+    for n_steps in steps:
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ["XDG_CACHE_HOME"] = os.path.join(directory, "cache")
+            os.chdir(directory)
+            try:
+                for name, value in bench_runbook(app, n_steps, hosts).items():
+                    results[f"app {n_steps} steps: {name}"] = value
+            finally:
+                os.chdir(cwd)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--steps', default="10,500,5000", help="comma separated main step counts")
+    parser.add_argument('--hosts', default="22,2000", help="comma separated host counts for save_text/save_1u_text")
+    parser.add_argument('--json', help="write the results here as JSON, - for stdout")
+    args = parser.parse_args()
+
+    results = run([int(n) for n in args.steps.split(',')], [int(n) for n in args.hosts.split(',')])
+    if args.json == "-":
+        print(json.dumps(results))
+        return
+    for name, value in results.items():
+        print(f"{name:<48}{value:>10.2f}")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Throughput benchmark for the info/bmc emitter.
+
+    python benchmarks/bench_emitter.py [--hosts 20000] [--repeat 3]
+
+Times the emitter against yaml.dump of the equivalent dicts. Its output is
+checked byte for byte against yaml.dump in tests/test_emitter.py.
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from emitter import write_bmc, write_info  # noqa: E402
+from generator import bmc_data, info_data  # noqa: E402
+
+
+def reference(hosts_info, macs, pws, mtm, hosts_bmc, sort_info, sort_bmc, dump):
+    data = info_data(hosts_info, macs, pws, mtm)
+    if sort_info:
+        data = {k: data[k] for k in sorted(data, reverse=True)}
+    return dump(data, sort_keys=False), dump(bmc_data(hosts_bmc, pws), sort_keys=sort_bmc)
+
+
+def emitted(hosts_info, macs, pws, mtm, hosts_bmc, sort_info, sort_bmc):
+    info = io.StringIO()
+    bmc = io.StringIO()
+    write_info(info, [(h, m, p, mtm) for h, m, p in zip(hosts_info, macs, pws)], reverse_sort=sort_info)
+    write_bmc(bmc, zip(hosts_bmc, pws), sort=sort_bmc)
+    return info.getvalue(), bmc.getvalue()
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    hosts = [f"a{i // 2000:02d}-sr01-rk{i // 22:04d}-s{i % 22:02d}" for i in range(args.hosts)]
+    macs = [f"AA:BB:CC:{i >> 16 & 255:02X}:{i >> 8 & 255:02X}:{i & 255:02X}" for i in range(args.hosts)]
+    pws = [f"Pw{i:08d}x" for i in range(args.hosts)]
+    case = (hosts[::-1], macs, pws, "SR650", hosts[::-1], True, True)
+
+    timings = {'emitter': best_of(lambda: emitted(*case), args.repeat)}
+    timings['yaml.dump'] = best_of(lambda: reference(*case, yaml.dump), args.repeat)
+    if getattr(yaml, '__with_libyaml__', False):
+        timings['yaml.dump (CDumper)'] = best_of(lambda: reference(*case, lambda d, **kw: yaml.dump(d, Dumper=yaml.CDumper, **kw)), args.repeat)
+
+    print(f"{args.hosts} hosts, info + bmc documents")
+    for name, seconds in timings.items():
+        print(f"{name:<22}{seconds * 1000:>10.1f} ms{args.hosts / seconds:>12.0f} hosts/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Fleet generation throughput on synthetic rack inventories.
+
+    python benchmarks/bench_fleet.py [--racks 1,100,1000,10000] [--workers 4] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from fleet import generate_fleet, read_inventory  # noqa: E402
+from synthetic import write_inventory  # noqa: E402
+
+
+def run(racks, workers=None):
+    results = {}
+    for n_racks in racks:
+        with tempfile.TemporaryDirectory() as directory:
+            inventory = write_inventory(os.path.join(directory, "in"), n_racks)
+            start = time.perf_counter()
+            report = generate_fleet(read_inventory(inventory), os.path.dirname(inventory), os.path.join(directory, "out"), workers)
+            elapsed = time.perf_counter() - start
+            if report.failed:
+                raise RuntimeError(f"{len(report.failed)} racks failed, first: {report.failed[0]}")
+            results[f"fleet {n_racks} racks ms"] = elapsed * 1000
+            results[f"fleet {n_racks} racks ms/rack"] = elapsed * 1000 / n_racks
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--racks', default="1,100,1000,10000", help="comma separated inventory sizes")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--json', help="write the results here as JSON, - for stdout")
+    args = parser.parse_args()
+
+    results = run([int(n) for n in args.racks.split(',')], args.workers)
+    if args.json == "-":
+        print(json.dumps(results))
+        return
+    for name, value in results.items():
+        print(f"{name:<48}{value:>10.2f}")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Compares the session file formats on a realistic session.
+
+    python benchmarks/bench_serialization.py [--steps 400] [--repeat 5]
+
+The session is built the way the app saves one (RackSession.save_data:
+progress bitsets, notes and generated documents), then timed through
+dump_session, read_session_header and load_session_file for .yaml and .json.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from checklist import ChecklistModel, catalog_version  # noqa: E402
+from generator import generate_2u  # noqa: E402
+from serialization import LIBYAML, dump_session, load_session_file, read_session_header  # noqa: E402
+from session import RackSession  # noqa: E402
+from synthetic import make_checklist, make_notes, rack_lines  # noqa: E402
+
+
+def make_session(n_steps=400, seed=0):
+    rng = random.Random(seed)
+    steps = make_checklist(n_steps, seed=seed)['steps']
+    checklist = ChecklistModel(steps)
+    session = RackSession(None)
+    checklist.load_states(session.checkbox_states)
+    for main_step, sub_steps in steps.items():
+        for index in range(len(sub_steps)):
+            if rng.random() < 0.5:
+                checklist.set_checked(main_step, index, True)
+    session.bits = checklist.bits
+    session.sys_var = "SYS-1234"
+    session.rack_var = "a01-sr01-rk01"
+    session.mtm_var = "SR650"
+    session.user_notes = make_notes(steps, seed=seed)
+    outputs = generate_2u(session.rack_var, *rack_lines(1), session.mtm_var)
+    session.u2_info_yaml_str = outputs['info']
+    session.u2_bmc_yaml_str = outputs['bmc']
+    return session.save_data(catalog_version(steps))
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--steps', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    session = make_session(args.steps)
+    print(f"session: {len(session['progress'])} steps, {len(session['user_notes'])} notes, libyaml loader={LIBYAML}")
+    print(f"{'format':<8}{'dump ms':>10}{'header ms':>11}{'load ms':>10}{'size KB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for ext in ('.yaml', '.json'):
+            filename = os.path.join(directory, "session" + ext)
+            text = dump_session(session, filename)
+            with open(filename, 'w') as file:
+                file.write(text)
+            assert load_session_file(filename) == session
+            dump_s = best_of(lambda: dump_session(session, filename), args.repeat)
+            header_s = best_of(lambda: read_session_header(filename), args.repeat)
+            load_s = best_of(lambda: load_session_file(filename), args.repeat)
+            print(f"{ext:<8}{dump_s * 1000:>10.1f}{header_s * 1000:>11.2f}{load_s * 1000:>10.1f}{len(text) / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Runs the benchmark suite and writes one JSON file of results, all in ms (lower is better).
+
+    python benchmarks/run.py --out results.json
+    python benchmarks/run.py --out new.json --baseline results.json [--threshold 1.15]
+    python benchmarks/run.py --quick            # small sizes, for a smoke test
+
+Each suite runs in its own process so a missing PyQt5 (or a crash) only
+skips that suite. With --baseline every metric is compared against the old
+file and the exit status is 1 if any got slower by more than --threshold.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SUITES = {
+    'app': ('bench_app.py', {'full': ['--steps', '10,500,5000', '--hosts', '22,2000'],
+                             'quick': ['--steps', '10,200', '--hosts', '22']}),
+    'fleet': ('bench_fleet.py', {'full': ['--racks', '1,100,1000,10000'],
+                                 'quick': ['--racks', '1,50']}),
+}
+
+
+def run_suite(script, extra_args):
+    command = [sys.executable, os.path.join(BENCH_DIR, script), '--json', '-'] + extra_args
+    process = subprocess.run(command, capture_output=True, text=True)
+    lines = process.stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        error = (process.stderr.strip().splitlines() or ["no output"])[-1]
+        return None, error
+    # The results are the last line, anything before it is the app's own chatter
+    return json.loads(lines[-1]), None
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'metric':<56}{'baseline':>11}{'now':>11}{'ratio':>8}")
+    for name, value in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<56}{'-':>11}{value:>11.2f}{'new':>8}")
+            continue
+        ratio = value / old if old else float('inf')
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{name:<56}{old:>11.2f}{value:>11.2f}{ratio:>8.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', default="bench-results.json")
+    parser.add_argument('--baseline', help="earlier --out file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.15, help="ratio over baseline that counts as a regression")
+    parser.add_argument('--suite', action='append', choices=list(SUITES), help="only run these suites")
+    parser.add_argument('--quick', action='store_true')
+    args = parser.parse_args()
+
+    size = 'quick' if args.quick else 'full'
+    results = {}
+    skipped = {}
+    for name in args.suite or SUITES:
+        script, sizes = SUITES[name]
+        start = time.perf_counter()
+        suite_results, error = run_suite(script, sizes[size])
+        if suite_results is None:
+            skipped[name] = error
+            print(f"{name}: skipped ({error})", file=sys.stderr)
+            continue
+        results.update(suite_results)
+        print(f"{name}: {len(suite_results)} metrics in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    with open(args.out, 'w') as file:
+        json.dump({
+            'meta': {'time': time.time(), 'python': platform.python_version(), 'platform': platform.platform(),
+                     'size': size, 'skipped': skipped},
+            'results': results,
+        }, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.threshold:.2f}x", file=sys.stderr)
+            return 1
+    else:
+        for name, value in results.items():
+            print(f"{name:<56}{value:>11.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
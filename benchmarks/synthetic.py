@@ -0,0 +1,73 @@
+"""Synthetic runbooks, sessions and rack inventories for the benchmarks.
+
+Everything is seeded, so the same arguments always produce the same files.
+"""
+import os
+import random
+from serialization import dump_yaml
+
+WORDS = ["rack", "bmc", "switch", "cable", "firmware", "xcat", "node", "power", "verify", "ping",
+         "{rack}", "{bmc}", "{mtor}", "{server}"]
+
+
+def make_checklist(n_steps=100, max_sub_steps=12, description_words=30, seed=0):
+    """Returns the steps.yaml dict: n_steps main steps of 1..max_sub_steps sub-steps each."""
+    rng = random.Random(seed)
+    steps = {}
+    descriptions = {}
+    for i in range(n_steps):
+        name = f"Step {i:05d} {rng.choice(WORDS[:10])}"
+        subs = [f"{name} / {j:02d} {' '.join(rng.choices(WORDS[:10], k=3))}" for j in range(rng.randint(1, max_sub_steps))]
+        steps[name] = subs
+        for sub in subs:
+            descriptions[sub] = " ".join(rng.choices(WORDS, k=description_words))
+    return {'steps': steps, 'sub_step_descriptions': descriptions}
+
+
+def write_checklist(path, n_steps=100, max_sub_steps=12, seed=0):
+    checklist = make_checklist(n_steps, max_sub_steps, seed=seed)
+    with open(path, 'w') as file:
+        file.write(dump_yaml(checklist, sort_keys=False))
+    return checklist
+
+
+def write_topology(path, host_counts):
+    """topology.yaml with a BENCH-{n} MTM per host count, n 1U slots each."""
+    mtm = {f"BENCH-{n}": {'u_height': 1, 'slots': [[1, n]], 'exclude': [], 'max_hosts': n} for n in host_counts}
+    with open(path, 'w') as file:
+        file.write(dump_yaml({'mtm': mtm}, sort_keys=False))
+
+
+def make_notes(steps, fraction=0.3, note_chars=2000, seed=0):
+    rng = random.Random(seed)
+    notes = {}
+    for subs in steps.values():
+        for sub in subs:
+            if rng.random() < fraction:
+                notes[sub] = "\n".join(" ".join(rng.choices(WORDS[:10], k=8)) for _ in range(max(1, note_chars // 60)))
+    return notes
+
+
+def rack_name(i):
+    return f"a{i // 400 + 1:02d}-sr{i // 20 % 20 + 1:02d}-rk{i % 100:02d}"
+
+
+def rack_lines(i, hosts=22):
+    macs = [f"AA:BB:{i >> 8 & 255:02X}:{i & 255:02X}:00:{slot:02X}" for slot in range(hosts)]
+    pws = [f"Pw{i:05d}{slot:02d}x" for slot in range(hosts)]
+    return macs, pws
+
+
+def write_inventory(directory, n_racks, hosts=22, mtm="SR650"):
+    """Writes per-rack MAC/password lists and an inventory.csv for `main.py fleet`, returns the CSV path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "inventory.csv")
+    with open(path, 'w') as inventory:
+        inventory.write("rack,mtm,form,macs,pws\n")
+        for i in range(n_racks):
+            macs, pws = rack_lines(i, hosts)
+            for suffix, lines in (("macs", macs), ("pws", pws)):
+                with open(os.path.join(directory, f"{i:05d}-{suffix}.txt"), 'w') as file:
+                    file.write("\n".join(lines) + "\n")
+            inventory.write(f"{rack_name(i)},{mtm},2u,{i:05d}-macs.txt,{i:05d}-pws.txt\n")
+    return path
@@ -0,0 +1,291 @@
+"""Checks that freshly generated BMC entries are reachable and take their password.
+
+    python main.py bmc-check --info a01-sr01-rk07-info.yaml [--check tcp,redfish] [--user ADMIN]
+    python main.py bmc-check --stand-in 1000 --concurrency 128     # tune against a local fake fleet
+
+Targets are the {host}-bmc entries of an info document. Every host runs its
+checks in order on one shared connection, at most --concurrency hosts at a
+time, each bounded by --timeout. A check is any coroutine
+check(prober, target, connection) returning (ok, detail); CHECKS holds the
+built-in ones and more (IPMI, vendor APIs) can be registered there.
+
+--stand-in N starts a local HTTP server posing as N BMCs (every name resolves
+to it, credentials are checked per Host header), so the prober and the
+concurrency settings can be exercised without touching real hardware.
+"""
+import sys
+import ssl
+import time
+import base64
+import asyncio
+import argparse
+from instrumentation import percentile
+from serialization import load_yaml
+
+
+class Target:
+    __slots__ = ('name', 'password', 'address', 'port')
+
+    def __init__(self, name, password, address=None, port=None):
+        self.name = name
+        self.password = password
+        self.address = address or name
+        self.port = port
+
+
+def targets_from_info(info_yaml):
+    """(name, password) targets from a generated {rack}-info.yaml document."""
+    data = load_yaml(info_yaml) or {}
+    return [Target(str(name), str(entry.get('password', ""))) for name, entry in data.items() if isinstance(entry, dict)]
+
+
+class Connection:
+    """One keep-alive stream per host, opened by the first check that needs it."""
+
+    def __init__(self, target, port, tls):
+        self.target = target
+        self.port = port
+        self.tls = tls
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        if self.writer is None:
+            context = None
+            if self.tls:
+                # BMCs ship self-signed certificates
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self.reader, self.writer = await asyncio.open_connection(self.target.address, self.port, ssl=context)
+        return self.reader, self.writer
+
+    async def request(self, path, user=None, password=None):
+        """Minimal HTTP/1.1 GET, returns (status, body)."""
+        reader, writer = await self.open()
+        headers = [f"GET {path} HTTP/1.1", f"Host: {self.target.name}", "Connection: keep-alive", "Accept: application/json"]
+        if user is not None:
+            token = base64.b64encode(f"{user}:{password}".encode()).decode()
+            headers.append(f"Authorization: Basic {token}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode())
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        body = await reader.readexactly(length) if length else b""
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def tcp_check(prober, target, connection):
+    await connection.open()
+    return True, f"port {connection.port} open"
+
+
+async def redfish_check(prober, target, connection):
+    status, _ = await connection.request("/redfish/v1/Systems", prober.user, target.password)
+    if status == 200:
+        return True, "credentials accepted"
+    if status in (401, 403):
+        return False, f"credentials rejected ({status})"
+    return False, f"unexpected HTTP {status}"
+
+
+CHECKS = {
+    'tcp': tcp_check,
+    'redfish': redfish_check,
+}
+
+
+class HostResult:
+    __slots__ = ('name', 'ok', 'details', 'seconds')
+
+    def __init__(self, name, ok, details, seconds):
+        self.name = name
+        self.ok = ok
+        self.details = details
+        self.seconds = seconds
+
+    def line(self):
+        return f"{'OK  ' if self.ok else 'FAIL'} {self.name:<36}{self.seconds * 1000:>8.1f} ms  {'; '.join(self.details)}"
+
+
+class Prober:
+    def __init__(self, checks=('tcp', 'redfish'), concurrency=64, timeout=3.0, port=443, tls=True, user="ADMIN"):
+        self.checks = [(name, CHECKS[name]) for name in checks]
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.port = port
+        self.tls = tls
+        self.user = user
+
+    async def probe(self, target, semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            connection = Connection(target, target.port or self.port, self.tls)
+            details = []
+            ok = True
+            try:
+                for name, check in self.checks:
+                    try:
+                        passed, detail = await asyncio.wait_for(check(self, target, connection), self.timeout)
+                    except asyncio.TimeoutError:
+                        passed, detail = False, f"timed out after {self.timeout:g}s"
+                    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+                        passed, detail = False, str(e) or type(e).__name__
+                    details.append(f"{name}: {detail}")
+                    if not passed:
+                        ok = False
+                        break  # Later checks need what this one tested
+            finally:
+                connection.close()
+            return HostResult(target.name, ok, details, time.perf_counter() - start)
+
+    async def run(self, targets):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self.probe(target, semaphore) for target in targets))
+
+    def probe_all(self, targets):
+        """Blocking entry point, returns (results, report text)."""
+        start = time.perf_counter()
+        results = asyncio.run(self.run(targets))
+        return results, report(results, time.perf_counter() - start, self.concurrency)
+
+
+def report(results, elapsed, concurrency):
+    latencies = sorted(result.seconds for result in results)
+    failed = sum(1 for result in results if not result.ok)
+    rate = len(results) / elapsed if elapsed else 0.0
+    lines = [result.line() for result in sorted(results, key=lambda result: (result.ok, result.name))]
+    lines.append(f"{len(results) - failed}/{len(results)} BMCs passed in {elapsed:.2f}s ({rate:.0f} hosts/s, concurrency {concurrency}); "
+                 f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    return "\n".join(lines)
+
+
+class StandInBmc:
+    """Local HTTP server answering Redfish-style requests for any number of fake BMCs.
+
+    passwords maps the Host header to the password it accepts; latency is
+    added to every response to look like a BMC on a slow management network."""
+
+    def __init__(self, passwords, user="ADMIN", latency=0.005):
+        self.passwords = passwords
+        self.user = user
+        self.latency = latency
+        self.server = None
+        self.port = None
+        self.connections = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await asyncio.sleep(self.latency)
+                expected = self.passwords.get(headers.get('host'))
+                token = base64.b64encode(f"{self.user}:{expected}".encode()).decode()
+                if expected is None:
+                    status, body = 404, b'{"error": "unknown BMC"}'
+                elif headers.get('authorization') == f"Basic {token}":
+                    status, body = 200, b'{"Members@odata.count": 1}'
+                else:
+                    status, body = 401, b'{"error": "unauthorized"}'
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def stand_in_targets(count, port, wrong_every=10):
+    # Every tenth fake BMC gets the wrong password, so failures show up in the report too
+    targets = []
+    passwords = {}
+    for i in range(count):
+        name = f"a01-sr01-rk{i // 22:02d}-s{i % 22 * 2 + 2:02d}-bmc"
+        passwords[name] = f"Pw{i:06d}"
+        password = "wrong" if wrong_every and i % wrong_every == wrong_every - 1 else passwords[name]
+        targets.append(Target(name, password, "127.0.0.1", port))
+    return targets, passwords
+
+
+async def run_stand_in(prober, count, latency):
+    stand_in = await StandInBmc({}, prober.user, latency).start()
+    targets, stand_in.passwords = stand_in_targets(count, stand_in.port)
+    start = time.perf_counter()
+    results = await prober.run(targets)
+    elapsed = time.perf_counter() - start
+    await stand_in.stop()
+    return results, report(results, elapsed, prober.concurrency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py bmc-check", description="Probe the BMCs of a generated info document.")
+    parser.add_argument('--info', help="generated {rack}-info.yaml")
+    parser.add_argument('--stand-in', type=int, metavar='N', help="probe N fake BMCs on a local server instead")
+    parser.add_argument('--check', default="tcp,redfish", help=f"comma separated, from: {', '.join(CHECKS)}")
+    parser.add_argument('--user', default="ADMIN")
+    parser.add_argument('--port', type=int, default=443)
+    parser.add_argument('--no-tls', action='store_true', help="plain HTTP instead of HTTPS")
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=3.0, help="seconds per check per host")
+    parser.add_argument('--latency', type=float, default=0.005, help="stand-in only: seconds added to every response")
+    parser.add_argument('--quiet', action='store_true', help="only print failures and the summary")
+    args = parser.parse_args(argv)
+
+    checks = [name.strip() for name in args.check.split(',') if name.strip()]
+    unknown = [name for name in checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown check(s): {', '.join(unknown)}")
+    prober = Prober(checks, args.concurrency, args.timeout, args.port, not args.no_tls and not args.stand_in, args.user)
+
+    if args.stand_in:
+        results, text = asyncio.run(run_stand_in(prober, args.stand_in, args.latency))
+    elif args.info:
+        with open(args.info, 'r') as file:
+            results, text = prober.probe_all(targets_from_info(file.read()))
+    else:
+        parser.error("either --info or --stand-in is required")
+
+    lines = text.split("\n")
+    if args.quiet:
+        lines = [line for line in lines[:-1] if line.startswith("FAIL")] + lines[-1:]
+    print("\n".join(lines))
+    # Stand-in runs fail some hosts on purpose
+    return 0 if args.stand_in or all(result.ok for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
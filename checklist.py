@@ -0,0 +1,314 @@
+import os
+import hashlib
+import marshal
+import string
+from collections import Counter
+from serialization import dump_json, load_json, load_yaml
+
+CACHE_VERSION = 3
+
+# Rack variables the sub step descriptions can reference, e.g. "ssh {bmc}"
+TEMPLATE_FIELDS = ('sys', 'rack', 'mtm', 'plain_rack', 'mtor', 'tor', 'pdu', 'bmc', 'server')
+
+
+def cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "xcat-checklist")
+
+
+def cache_path(source_path, directory=None):
+    key = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()
+    return os.path.join(directory or cache_dir(), f"{key}.marshal")
+
+
+def compile_template(text, fields=TEMPLATE_FIELDS):
+    """Splits a description into (literal, field, format_spec, conversion) segments.
+
+    Returns (segments, problems); fields outside `fields` are kept and
+    rendered back as the raw placeholder instead of failing at click time."""
+    problems = []
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError as e:
+        # Unbalanced braces, show the text as-is
+        return [(text, None, None, None)], [f"invalid template: {str(e)}"]
+
+    segments = []
+    for literal, field, spec, conversion in parsed:
+        if field is not None and field not in fields:
+            problems.append(f"undefined placeholder {{{field}}}")
+        segments.append((literal, field, spec, conversion))
+    return segments, problems
+
+
+def compile_templates(descriptions):
+    templates = {}
+    problems = []
+    for step_name, text in descriptions.items():
+        templates[step_name], step_problems = compile_template("" if text is None else str(text))
+        problems += [f"{step_name}: {problem}" for problem in step_problems]
+    return templates, problems
+
+
+def render_template(segments, variables):
+    parts = []
+    for literal, field, spec, conversion in segments:
+        parts.append(literal)
+        if field is None:
+            continue
+        if field not in variables:
+            # Leave unknown placeholders visible so the runbook author can spot them
+            parts.append("{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}")
+            continue
+        value = variables[field]
+        if conversion == 'r':
+            value = repr(value)
+        elif conversion == 'a':
+            value = ascii(value)
+        elif conversion == 's':
+            value = str(value)
+        try:
+            parts.append(format(value, spec or ""))
+        except (TypeError, ValueError):
+            parts.append(str(value))
+    return "".join(parts)
+
+
+class DescriptionRenderer:
+    """Renders compiled sub step descriptions, memoized until the rack variables change."""
+
+    def __init__(self, templates):
+        self.templates = templates
+        self.variables = {}
+        self.version = 0
+        self.rendered = {}
+
+    def set_variables(self, variables):
+        if variables == self.variables:
+            return
+        self.variables = dict(variables)
+        self.version += 1
+        self.rendered = {}
+
+    def render(self, step_name):
+        key = (step_name, self.version)
+        text = self.rendered.get(key)
+        if text is None:
+            segments = self.templates.get(step_name)
+            text = render_template(segments, self.variables) if segments else ""
+            self.rendered[key] = text
+        return text
+
+
+def catalog_version(steps):
+    # Content hash of the step catalog; order matters, it decides the bit positions
+    return hashlib.sha256(dump_json(steps).encode()).hexdigest()
+
+
+def parse_checklist(raw):
+    data = load_yaml(raw) or {}
+    descriptions = data.get('sub_step_descriptions', {})
+    templates, problems = compile_templates(descriptions)
+    steps = data.get('steps', {})
+    return {
+        'steps': steps,
+        'version': catalog_version(steps),
+        'sub_step_descriptions': descriptions,
+        'templates': templates,
+        'template_problems': problems,
+    }
+
+
+def read_cache(path):
+    try:
+        with open(path, 'rb') as file:
+            entry = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION:
+        return None
+    return entry
+
+
+def write_cache(path, entry):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            marshal.dump(entry, file)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # A read-only home directory just means no cache, not a failed start
+        print(f"Could not write checklist cache {path}: {str(e)}")
+
+
+def load_checklist(source_path, directory=None):
+    """Returns (checklist, cache_hit) for steps.yaml, parsing it only when it changed.
+
+    The cache entry is checked against the file's mtime and size first; if those
+    moved, the content hash decides whether the YAML really has to be parsed again."""
+    st = os.stat(source_path)
+    path = cache_path(source_path, directory)
+    entry = read_cache(path)
+
+    if entry is not None and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+        return entry['checklist'], True
+
+    with open(source_path, 'rb') as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if entry is not None and entry['sha256'] == digest:
+        # Touched but not edited, just refresh the stat fields
+        hit = True
+        checklist = entry['checklist']
+    else:
+        hit = False
+        checklist = parse_checklist(raw)
+
+    write_cache(path, {
+        'version': CACHE_VERSION,
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+        'sha256': digest,
+        'checklist': checklist,
+    })
+    return checklist, hit
+
+
+class CatalogStore:
+    """Content-addressed copies of every step catalog sessions were saved against.
+
+    Sessions only record the catalog version and a bitset per main step, the
+    sub-step names behind those bits are looked up here when steps.yaml has
+    changed since the session was saved."""
+
+    def __init__(self, directory="step-catalog"):
+        self.directory = directory
+        self.loaded = {}
+
+    def path(self, version):
+        return os.path.join(self.directory, f"{version}.json")
+
+    def put(self, version, steps):
+        path = self.path(version)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as file:
+                file.write(dump_json(steps))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not store step catalog {path}: {str(e)}")
+
+    def get(self, version):
+        if version not in self.loaded:
+            try:
+                with open(self.path(version), 'r') as file:
+                    self.loaded[version] = load_json(file)
+            except (OSError, ValueError):
+                return None
+        return self.loaded[version]
+
+
+def pack_states(chk_states):
+    bits = 0
+    for i, checked in enumerate(chk_states):
+        if checked:
+            bits |= 1 << i
+    return bits
+
+
+def unpack_progress(progress, steps):
+    return {main_step: [bool(int(progress.get(main_step) or 0) >> i & 1) for i in range(len(sub_steps))]
+            for main_step, sub_steps in steps.items()}
+
+
+def migrate_states(states, old_steps, steps):
+    """Carries ticks over to a changed catalog by sub-step name; new sub-steps start unticked."""
+    migrated = {}
+    for main_step, sub_steps in steps.items():
+        old_sub_steps = old_steps.get(main_step) or []
+        old_states = states.get(main_step) or []
+        checked = Counter(name for name, done in zip(old_sub_steps, old_states) if done)
+        migrated[main_step] = []
+        for name in sub_steps:
+            migrated[main_step].append(checked[name] > 0)
+            if checked[name]:
+                checked[name] -= 1
+    return migrated
+
+
+def saved_states(session, steps, version, store):
+    """Checkbox states for the current steps from a saved session.
+
+    Returns (states, note), note says how the states were carried over when the
+    session was saved against a different steps.yaml, None otherwise."""
+    progress = session.get('progress')
+    if progress is not None:
+        saved_version = session.get('checklist_version')
+        if saved_version == version:
+            return unpack_progress(progress, steps), None
+        old_steps = store.get(saved_version)
+        if old_steps is None:
+            return unpack_progress(progress, steps), f"step catalog {saved_version} not found, progress kept by position"
+        return migrate_states(unpack_progress(progress, old_steps), old_steps, steps), "progress migrated to the current steps.yaml"
+
+    # Sessions from before the catalog split carry their own copy of the steps
+    states = session.get('checkbox_states') or {}
+    old_steps = session.get('steps')
+    if not old_steps or old_steps == steps:
+        return states, None
+    return migrate_states(states, old_steps, steps), "progress migrated to the current steps.yaml"
+
+
+class ChecklistModel:
+    """In-memory index over the steps: row numbers and how many sub-steps
+    of each main step are ticked, so a toggle is O(1)."""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.rows = {main_step: row for row, main_step in enumerate(steps)}
+        self.sizes = {main_step: len(sub_steps) for main_step, sub_steps in steps.items()}
+        self.states = {}
+        self.done = {}
+        self.bits = {}
+        self.load_states({})
+
+    def load_states(self, states):
+        # Keeps the caller's dict (it's what gets saved), filling in steps it doesn't know about
+        for main_step, size in self.sizes.items():
+            chk_states = states.get(main_step)
+            if chk_states is None or len(chk_states) != size:
+                chk_states = list(chk_states or [])[:size]
+                chk_states += [False] * (size - len(chk_states))
+                states[main_step] = chk_states
+        self.states = states
+        self.done = {main_step: sum(1 for checked in states[main_step] if checked) for main_step in self.sizes}
+        self.bits = {main_step: pack_states(states[main_step]) for main_step in self.sizes}
+        return states
+
+    def use(self, states, done, bits):
+        # Show another rack's progress, the counters come along so nothing is recounted
+        self.states = states
+        self.done = done
+        self.bits = bits
+
+    def row(self, main_step):
+        return self.rows[main_step]
+
+    def is_complete(self, main_step):
+        return self.done[main_step] == self.sizes[main_step]
+
+    def set_checked(self, main_step, index, checked):
+        """Returns True when the step's completion flipped."""
+        chk_states = self.states[main_step]
+        if chk_states[index] == checked:
+            return False
+        was_complete = self.is_complete(main_step)
+        chk_states[index] = checked
+        self.done[main_step] += 1 if checked else -1
+        self.bits[main_step] ^= 1 << index
+        return was_complete != self.is_complete(main_step)
@@ -0,0 +1,142 @@
+"""Headless vi generator, no Qt needed.
+
+    python main.py generate --rack a01-sr01-rk07 --mtm SR650 --macs macs.txt --pws pws.txt
+    python main.py generate --form 1u --rack a01-sr01-rk07 --hosts hosts.txt --macs macs.txt --pws pws.txt
+    python main.py generate --manifest racks.yaml --out build/
+    python main.py generate --rack a01-sr01-rk07 --by-key --macs bmc-macs.txt --pws bmc-pws.txt
+    python main.py generate --rack a01-sr01-rk07 --by-key --hosts serials.txt --macs bmc-macs.txt --pws bmc-pws.txt
+    python main.py sessions rk07
+    python main.py bmc-check --info a01-sr01-rk07-info.yaml
+
+With --by-key (or `by_key: true` in the manifest) each MAC and password line
+starts with the host it belongs to, as a full name or its slot part, e.g.
+"s02 aa:bb:cc:dd:ee:ff", and rows are joined on that instead of by position.
+Lines keyed by serial number need --hosts to map them: one "<serial> <host
+or slot>" line per server.
+
+A manifest is a YAML list of racks with the same keys as the flags:
+
+    - rack: a01-sr01-rk07
+      mtm: SR650
+      macs: rk07-macs.txt      # file path, relative to the manifest...
+      pws: [pw1, pw2]          # ...or the lines inline
+    - rack: a01-sr01-rk08
+      form: 1u
+      hosts: rk08-hosts.txt
+      macs: rk08-macs.txt
+      pws: rk08-pws.txt
+"""
+import os
+import sys
+import argparse
+from generator import format_mac_issues, generate_1u, generate_2u, generate_keyed, write_outputs
+from importer import iter_lines, pair_by_key, read_host_map
+from serialization import load_yaml
+
+
+def read_lines(value, base_dir=".", use_mmap=False):
+    if value is None:
+        return iter(())
+    if isinstance(value, str) and value != "-":
+        value = os.path.join(base_dir, value)
+    return iter_lines(value, use_mmap)
+
+
+def truthy(value):
+    return str(value).lower() in ('1', 'true', 'yes', 'y')
+
+
+def generate_rack(entry, base_dir=".", out_dir="."):
+    rack = entry['rack']
+    mtm = entry.get('mtm', "")
+    form = str(entry.get('form', '2u')).lower()
+    use_mmap = truthy(entry.get('mmap', False))
+    macs = read_lines(entry.get('macs'), base_dir, use_mmap)
+    pws = read_lines(entry.get('pws'), base_dir, use_mmap)
+
+    unmatched = []
+    if truthy(entry.get('by_key', False)):
+        host_map = read_host_map(read_lines(entry['hosts'], base_dir, use_mmap)) if entry.get('hosts') else None
+        outputs = generate_keyed(rack, pair_by_key(macs, pws, unmatched), mtm, form, host_map)
+    elif form == '1u':
+        outputs = generate_1u(rack, read_lines(entry.get('hosts'), base_dir, use_mmap), macs, pws, mtm)
+    else:
+        outputs = generate_2u(rack, macs, pws, mtm)
+    for line in unmatched + format_mac_issues(outputs['mac_issues']):
+        print(f"{rack}: {line}", file=sys.stderr)
+    return write_outputs(rack, outputs, out_dir)
+
+
+def load_manifest(path):
+    with open(path, 'r') as file:
+        entries = load_yaml(file) or []
+    if isinstance(entries, dict):
+        entries = entries.get('racks', [])
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py generate", description="Generate {rack}-info.yaml, {rack}.txt and {rack}bmc.txt without the GUI.")
+    parser.add_argument('--manifest', help="YAML list of racks to generate in one go")
+    parser.add_argument('--rack', help="full rack name, e.g. a01-sr01-rk07")
+    parser.add_argument('--mtm', default="")
+    parser.add_argument('--form', choices=['2u', '1u'], default='2u')
+    parser.add_argument('--macs', help="file with one MAC per line, - for stdin")
+    parser.add_argument('--pws', help="file with one password per line, - for stdin")
+    parser.add_argument('--hosts', help="1U: file with one host suffix per line; --by-key: \"<serial> <host or slot>\" lines")
+    parser.add_argument('--by-key', action='store_true', help="pair MAC and password lines by their leading host/serial instead of by position")
+    parser.add_argument('--mmap', action='store_true', help="memory-map the input files, for very large exports")
+    parser.add_argument('--out', default=".", help="output directory")
+    args = parser.parse_args(argv)
+
+    if args.manifest:
+        entries = load_manifest(args.manifest)
+        base_dir = os.path.dirname(os.path.abspath(args.manifest))
+    elif args.rack:
+        entries = [{'rack': args.rack, 'mtm': args.mtm, 'form': args.form, 'macs': args.macs, 'pws': args.pws, 'hosts': args.hosts,
+                    'by_key': args.by_key, 'mmap': args.mmap}]
+        base_dir = "."
+    else:
+        parser.error("either --manifest or --rack is required")
+
+    failed = 0
+    for entry in entries:
+        try:
+            for path in generate_rack(entry, base_dir, args.out):
+                print(path)
+        except Exception as e:
+            failed += 1
+            print(f"Generating {entry.get('rack')} failed: {str(e)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def fleet(argv=None):
+    from fleet import main as fleet_main
+    return fleet_main(argv)
+
+
+def bmc_check(argv=None):
+    from bmc_check import main as bmc_check_main
+    return bmc_check_main(argv)
+
+
+def sessions(argv=None):
+    from session_index import main as sessions_main
+    return sessions_main(argv)
+
+
+# Subcommands of main.py that run without the GUI
+COMMANDS = {
+    'generate': main,
+    'fleet': fleet,
+    'sessions': sessions,
+    'bmc-check': bmc_check,
+}
+
+
+def run(argv):
+    return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import re
+from functools import lru_cache
+import yaml
+from serialization import dump_yaml
+
+# Hand-rolled writer for the two fixed generator schemas:
+#
+#   {host}-bmc:            bmc:
+#     mac: ...               {host}:
+#     password: ...            vendor_password: ...
+#     mtm: ...
+#
+# Output is byte-identical to yaml.dump of the equivalent dicts. Scalars that
+# can be written plain are checked once with PyYAML's own resolver, anything
+# needing quotes (or odd types) sends just that entry through yaml.dump.
+
+PLAIN_RE = re.compile(r'[A-Za-z0-9_/][A-Za-z0-9_./+-]*(?::[A-Za-z0-9_./+-]+)*')
+RESOLVER = yaml.resolver.Resolver()
+STR_TAG = 'tag:yaml.org,2002:str'
+IMPLICIT_FIRST = frozenset(ch for ch in RESOLVER.yaml_implicit_resolvers if ch)
+
+
+@lru_cache(maxsize=4096)
+def plain_scalar(value):
+    """Returns value as a plain YAML scalar, or None when yaml.dump would quote it."""
+    if value == "":
+        return "''"
+    if len(value) > 100 or not PLAIN_RE.fullmatch(value):
+        return None
+    # "true", "12:30", "0x1F", "2024-01-01"... would load back as something else.
+    # The resolver only has patterns for a handful of first characters.
+    if value[0] in IMPLICIT_FIRST and RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) != STR_TAG:
+        return None
+    return value
+
+
+def scalar(value):
+    return plain_scalar(value) if type(value) is str else None
+
+
+def key_scalar(value):
+    # yaml.dump writes an empty key in the explicit "? ''" form
+    return scalar(value) if value != "" else None
+
+
+def dedupe(rows):
+    # Same as building a dict from the rows: first position wins, last value wins
+    seen = {}
+    for row in rows:
+        seen[row[0]] = row
+    return list(seen.values())
+
+
+def write_info(out, rows, reverse_sort=False):
+    """Writes the {host}-bmc document for (host, mac, password, mtm) rows."""
+    rows = [(f"{host}-bmc", mac, pw, mtm) for host, mac, pw, mtm in rows]
+    if len({row[0] for row in rows}) != len(rows):
+        rows = dedupe(rows)
+    if reverse_sort:
+        rows.sort(key=lambda row: row[0], reverse=True)
+    if not rows:
+        out.write("{}\n")
+        return
+
+    write = out.write
+    for key, mac, pw, mtm in rows:
+        parts = (key_scalar(key), scalar(mac), scalar(pw), scalar(mtm))
+        if None in parts:
+            write(dump_yaml({key: {'mac': mac, 'password': pw, 'mtm': mtm}}, sort_keys=False))
+        else:
+            write(f"{parts[0]}:\n  mac: {parts[1]}\n  password: {parts[2]}\n  mtm: {parts[3]}\n")
+
+
+def write_bmc(out, rows, sort=False):
+    """Writes the bmc: document for (host, password) rows."""
+    rows = list(rows)
+    if len({row[0] for row in rows}) != len(rows):
+        rows = dedupe(rows)
+    if sort:
+        rows.sort(key=lambda row: row[0])
+    if not rows:
+        out.write("bmc: {}\n")
+        return
+
+    write = out.write
+    write("bmc:\n")
+    for host, pw in rows:
+        parts = (key_scalar(host), scalar(pw))
+        if None in parts:
+            text = dump_yaml({'bmc': {host: {'vendor_password': pw}}}, sort_keys=False)
+            write(text[len("bmc:\n"):])
+        else:
+            write(f"  {parts[0]}:\n    vendor_password: {parts[1]}\n")
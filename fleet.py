@@ -0,0 +1,132 @@
+"""Fleet generation: vi outputs for hundreds of racks across worker processes.
+
+    python main.py fleet --inventory racks.csv --out build/ [--workers 8]
+
+The inventory is either a CSV with a header row (rack,mtm,form,macs,pws,hosts,
+where macs/pws/hosts are file paths relative to the inventory) or a YAML
+manifest as accepted by `main.py generate --manifest`. Each worker writes its
+rack's files itself, only a small status tuple comes back to the parent, and
+no more than a few racks per worker are queued at once, so memory stays flat
+however long the inventory is.
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from cli import generate_rack, load_manifest
+
+
+def read_inventory(path):
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with open(path, 'r', newline='') as file:
+            for row in csv.DictReader(file):
+                # Blank cells mean "not given", same as a missing YAML key
+                yield {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+    else:
+        yield from load_manifest(path)
+
+
+def generate_job(entry, base_dir, out_dir):
+    # Runs in a worker process
+    try:
+        paths = generate_rack(entry, base_dir, out_dir)
+        return entry.get('rack'), sum(os.path.getsize(path) for path in paths), None
+    except Exception as e:
+        return entry.get('rack'), 0, str(e)
+
+
+class FleetReport:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.done = 0
+        self.bytes = 0
+        self.failed = []
+
+    def add(self, rack, size, error):
+        if error is None:
+            self.done += 1
+            self.bytes += size
+        else:
+            self.failed.append((rack, error))
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        lines = [f"{self.done} racks generated, {len(self.failed)} failed in {elapsed:.2f}s "
+                 f"({rate:.1f} racks/s, {self.bytes / 1024:.1f} KB written)"]
+        lines += [f"  {rack}: {error}" for rack, error in self.failed]
+        return "\n".join(lines)
+
+
+def generate_fleet(entries, base_dir=".", out_dir=".", workers=None, progress=None):
+    """Generates every rack in entries (any iterable, consumed lazily), returns a FleetReport."""
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    report = FleetReport()
+    os.makedirs(out_dir, exist_ok=True)
+
+    racks = {}  # future -> rack name, for failures that never got to return one
+
+    def collect(futures):
+        # Returns True if the pool broke (a worker died, e.g. OOM-killed)
+        broken = False
+        for future in futures:
+            rack = racks.pop(future)
+            try:
+                rack, size, error = future.result()
+            except BrokenProcessPool as e:
+                # Every rack still queued fails with it, there's no telling which one killed the worker
+                size, error = 0, f"worker process died: {str(e) or 'BrokenProcessPool'}"
+                broken = True
+            report.add(rack, size, error)
+            if progress is not None:
+                progress(rack, error)
+        return broken
+
+    def restart(pool):
+        # Whatever was queued on the broken pool fails with it
+        collect(list(racks))
+        pool.shutdown(wait=False)
+        return ProcessPoolExecutor(max_workers=workers)
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for entry in entries:
+            if len(racks) >= window:
+                done, _ = wait(racks, return_when=FIRST_COMPLETED)
+                if collect(done):
+                    pool = restart(pool)
+            try:
+                future = pool.submit(generate_job, entry, base_dir, out_dir)
+            except BrokenProcessPool:
+                pool = restart(pool)
+                future = pool.submit(generate_job, entry, base_dir, out_dir)
+            racks[future] = entry.get('rack')
+        collect(list(racks))
+    finally:
+        pool.shutdown()
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py fleet", description="Generate vi outputs for a whole inventory of racks in parallel.")
+    parser.add_argument('--inventory', required=True, help="CSV or YAML list of racks")
+    parser.add_argument('--out', default=".", help="output directory")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes, defaults to the CPU count")
+    parser.add_argument('--quiet', action='store_true', help="only print the summary")
+    args = parser.parse_args(argv)
+
+    def progress(rack, error):
+        if error is not None:
+            print(f"{rack}: FAILED {error}", file=sys.stderr)
+        elif not args.quiet:
+            print(rack)
+
+    base_dir = os.path.dirname(os.path.abspath(args.inventory))
+    report = generate_fleet(read_inventory(args.inventory), base_dir, args.out, args.workers, progress)
+    print(report.summary())
+    return 1 if report.failed else 0
@@ -0,0 +1,249 @@
+import io
+import os
+import re
+from collections import namedtuple
+from emitter import write_bmc, write_info
+from topology import topology_for
+
+# Pure data side of the vi generator tabs. Nothing in here touches Qt, so the
+# same code backs the GUI and `python main.py generate`.
+
+RACK_RE = re.compile(r'rk(\d+)')
+SR_RE = re.compile(r'sr(\d+)')
+
+
+def rack_variables(rack, mtm=None):
+    """Names derived from a full rack name like a01-sr01-rk07, using the MTM's naming patterns."""
+    variables = {}
+    match = RACK_RE.search(rack)
+    match_sr = SR_RE.search(rack)
+    variables['plain_rack'] = match.group(0) if match else None
+    variables['plain_sr'] = match_sr.group(0) if match_sr else None
+
+    if match:
+        fields = {'rack': rack, 'r': match.group(1), 'sr': match_sr.group(1) if match_sr else "", 'plain_rack': match.group(0)}
+        variables.update(topology_for(mtm).rack_names(fields))
+
+    if match_sr:
+        variables['sr'] = f'r{match.group(1) if match else match_sr.group(1)}s'
+
+    return variables
+
+
+def env_text(variables):
+    return f"""export MTOR={variables.get('mtor', '')}
+export TOR={variables.get('tor', '')}
+export PDU={variables.get('pdu', '')}
+export BMC={variables.get('bmc', '')}
+export SERVER={variables.get('server', '')}
+"""
+
+
+# Drops separators/whitespace and upper-cases hex digits in one C-level pass
+MAC_TRANSLATE = str.maketrans('abcdef', 'ABCDEF', ':-. \t\r\n')
+MAC_RE = re.compile(r'[0-9A-F]{12}')
+
+MacIssue = namedtuple('MacIssue', ['row', 'raw', 'reason'])
+
+
+def normalize_macs(values, rows=None, invalid='INVALID'):
+    """Normalizes a whole column of MACs to AA:BB:CC:DD:EE:FF.
+
+    Returns (macs, issues). macs lines up with values, unusable entries become
+    `invalid`. issues lists a MacIssue(row, raw, reason) for every malformed,
+    duplicate, multicast or locally administered address; rows defaults to
+    1-based positions in values."""
+    macs = []
+    issues = []
+    seen = {}
+    if rows is None:
+        rows = range(1, len(values) + 1)
+
+    for row, raw in zip(rows, values):
+        digits = raw.translate(MAC_TRANSLATE)
+        if not MAC_RE.fullmatch(digits):
+            macs.append(invalid)
+            reason = "not 12 hex digits" if len(digits) != 12 else "non-hex characters"
+            issues.append(MacIssue(row, raw, reason))
+            continue
+
+        mac = ':'.join((digits[0:2], digits[2:4], digits[4:6], digits[6:8], digits[8:10], digits[10:12]))
+        macs.append(mac)
+
+        if mac in seen:
+            issues.append(MacIssue(row, raw, f"duplicate of row {seen[mac]}"))
+        else:
+            seen[mac] = row
+
+        first_octet = int(digits[0:2], 16)
+        if first_octet & 0x01:
+            issues.append(MacIssue(row, raw, "multicast bit set"))
+        elif first_octet & 0x02:
+            issues.append(MacIssue(row, raw, "locally administered bit set"))
+
+    return macs, issues
+
+
+def clean_macs(macs):
+    """Normalizes the non-blank lines of a MAC column (any iterable), returns (macs, issues)."""
+    rows = []
+    values = []
+    for row, mac in enumerate(macs, 1):
+        if len(mac.strip()) >= 5:
+            rows.append(row)
+            values.append(mac)
+    return normalize_macs(values, rows)
+
+
+def format_mac_issues(issues):
+    return [f"MAC line {issue.row} ({issue.raw.strip()!r}): {issue.reason}" for issue in issues]
+
+
+def clean_password(pw):
+    return pw.strip().replace('"', '').replace('\'', '').replace('\n', '')
+
+
+def clean_passwords(pws):
+    return [clean_password(pw) for pw in pws if len(pw.strip()) >= 5]
+
+
+def hosts_2u(rack, mtm=None):
+    # Slot layout comes from topology.yaml (default: even slots 2-50 minus 22/24/26, 22 servers max)
+    return list(topology_for(mtm).hosts(rack))
+
+
+def hosts_1u(rack, hostlist):
+    return [rack + "-" + host for host in hostlist if host.strip()]
+
+
+# Dict forms of the two documents; generation writes them through emitter.py
+# instead, these are the reference it has to match byte for byte
+def info_data(hosts, macs, pws, mtm):
+    data = {}
+    for host, mac, pw in zip(hosts, macs, pws):
+        key = f"{host}-bmc"
+        data[key] = {
+            'mac': mac,
+            'password': pw,
+            'mtm': mtm,
+        }
+    return data
+
+
+def bmc_data(hosts, pws):
+    data = {'bmc': {}}
+    for host, pw in zip(hosts, pws):
+        data['bmc'][host] = {
+            'vendor_password': pw
+        }
+    return data
+
+
+def render_documents(info_rows, bmc_rows, sort_info=False, sort_bmc=False):
+    # Both documents in one go, straight into string buffers
+    info = io.StringIO()
+    bmc = io.StringIO()
+    write_info(info, info_rows, reverse_sort=sort_info)
+    write_bmc(bmc, bmc_rows, sort=sort_bmc)
+    return info.getvalue(), bmc.getvalue()
+
+
+def generate_2u(rack, macs, pws, mtm, hosts=None):
+    """Returns the info.yaml, bmc.txt and host list text for a 2U rack, plus any MAC issues."""
+    if hosts is None:
+        hosts = hosts_2u(rack, mtm)
+    reversed_hosts = hosts[::-1]
+    pws = clean_passwords(pws)
+    macs, mac_issues = clean_macs(macs)
+
+    # info is ordered by host name descending, bmc ascending (yaml.dump's sort_keys)
+    info, bmc = render_documents(
+        ((host, mac, pw, mtm) for host, mac, pw in zip(reversed_hosts, macs, pws)),
+        zip(reversed_hosts, pws),
+        sort_info=True, sort_bmc=True)
+    return {
+        'info': info,
+        'bmc': bmc,
+        'hosts': "\n".join(hosts),
+        'mac_issues': mac_issues,
+    }
+
+
+def generate_1u(rack, hostlist, macs, pws, mtm):
+    """Returns the info.yaml, bmc.txt and host list text for a 1U rack, plus the host list and MAC issues."""
+    clean_hosts = hosts_1u(rack, hostlist)
+    clean_rereversed_hosts = clean_hosts[::-1]
+    pws = clean_passwords(pws)
+    macs, mac_issues = clean_macs(macs)
+
+    info, bmc = render_documents(
+        ((host, mac, pw, mtm) for host, mac, pw in zip(clean_hosts, macs, pws)),
+        zip(clean_rereversed_hosts, pws))
+    return {
+        'info': info,
+        'bmc': bmc,
+        'hosts': "\n".join(clean_rereversed_hosts),
+        'hostlist': clean_rereversed_hosts,
+        'mac_issues': mac_issues,
+    }
+
+
+def generate_keyed(rack, pairs, mtm, form='2u', host_map=None):
+    """Like generate_2u/generate_1u, but from explicitly paired (row, key, mac, password)
+    entries instead of lining up separate columns by position. MAC issues are
+    reported against row, the entry's line in the MAC input.
+
+    A key is a host name or its slot part (s02 for {rack}-s02). Serial numbers
+    need host_map ({serial: host or slot}, see importer.read_host_map); keys it
+    doesn't know are taken as host names."""
+    rows = []
+    hosts = []
+    macs = []
+    pws = []
+    for row, key, mac, pw in pairs:
+        rows.append(row)
+        if host_map:
+            key = host_map.get(key, key)
+        hosts.append(key if key.startswith(rack + "-") else f"{rack}-{key}")
+        macs.append(mac)
+        pws.append(clean_password(pw))
+    macs, mac_issues = normalize_macs(macs, rows)
+
+    info_rows = [(host, mac, pw, mtm) for host, mac, pw in zip(hosts, macs, pws)]
+    if str(form).lower() == '1u':
+        info, bmc = render_documents(info_rows, zip(hosts[::-1], pws[::-1]))
+        host_text = "\n".join(hosts[::-1])
+    else:
+        info, bmc = render_documents(info_rows, zip(hosts, pws), sort_info=True, sort_bmc=True)
+        host_text = "\n".join(hosts)
+
+    return {
+        'info': info,
+        'bmc': bmc,
+        'hosts': host_text,
+        'hostlist': hosts[::-1],
+        'mac_issues': mac_issues,
+    }
+
+
+def output_filenames(rack):
+    plain_rack = rack_variables(rack)['plain_rack']
+    if plain_rack is None:
+        raise ValueError(f"rack name {rack!r} has no rkNN part")
+    return {
+        'info': f"{rack}-info.yaml",
+        'hosts': f"{plain_rack}.txt",
+        'bmc': f"{plain_rack}bmc.txt",
+    }
+
+
+def write_outputs(rack, outputs, out_dir="."):
+    """Writes a rack's generated documents, returns the paths written."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for kind, filename in output_filenames(rack).items():
+        path = os.path.join(out_dir, filename)
+        with open(path, 'w') as file:
+            file.write(outputs[kind])
+        paths.append(path)
+    return paths
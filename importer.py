@@ -0,0 +1,69 @@
+import os
+import re
+import sys
+import mmap
+
+# Streaming input for the vi generator: MAC/password/host lists are read a line
+# at a time from files or stdin instead of being pasted into text boxes.
+
+KEYED_SPLIT_RE = re.compile(r'[\s,;]+')
+
+
+def iter_lines(source, use_mmap=False):
+    """Yields the lines of a file path, '-' for stdin, or an already split list."""
+    if isinstance(source, list):
+        yield from (str(line) for line in source)
+        return
+    if source == "-":
+        for line in sys.stdin:
+            yield line.rstrip('\r\n')
+        return
+    if use_mmap:
+        with open(source, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for line in iter(mapped.readline, b''):
+                    yield line.decode('utf-8', 'replace').rstrip('\r\n')
+        return
+    with open(source, 'r') as file:
+        for line in file:
+            yield line.rstrip('\r\n')
+
+
+def iter_keyed(lines):
+    """Splits "<host or serial> <value>" lines (space, tab, comma or ; separated)."""
+    for row, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = KEYED_SPLIT_RE.split(line, 1)
+        if len(parts) == 2:
+            yield row, parts[0], parts[1]
+
+
+def read_host_map(lines):
+    """{serial: host} from "<serial> <host or slot>" lines, for keyed imports keyed by serial."""
+    return {key: host for row, key, host in iter_keyed(lines)}
+
+
+def pair_by_key(mac_lines, pw_lines, unmatched=None):
+    """Joins keyed MAC and password lines, yields (row, key, mac, password).
+
+    row is the line number in the MAC input. Only the password side is held in
+    memory; the MAC side streams through. Keys found on just one side are
+    appended to unmatched as messages."""
+    pws = {}
+    for row, key, pw in iter_keyed(pw_lines):
+        pws[key] = pw
+
+    for row, key, mac in iter_keyed(mac_lines):
+        pw = pws.pop(key, None)
+        if pw is None:
+            if unmatched is not None:
+                unmatched.append(f"MAC line {row}: no password for {key}")
+            continue
+        yield row, key, mac, pw
+
+    if unmatched is not None:
+        unmatched.extend(f"no MAC for {key}" for key in pws)
@@ -0,0 +1,150 @@
+"""Timing of the UI hot paths.
+
+    @instrument('on_main_step_clicked')
+    def on_main_step_clicked(self, index): ...
+
+    with profiler.timed('parse notes'):
+        ...
+
+Every call is kept in a bounded window per handler for p50/p99, calls that
+took longer than a 60 Hz frame are counted separately, and errors that the
+handlers swallow (they print and carry on) are counted too. report() is what
+the overlay shows, dump() writes the same numbers as JSON to compare builds.
+The persistence worker records from its own thread, so the stats are only
+touched under the profiler's lock.
+"""
+import copy
+import json
+import time
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+FRAME_SECONDS = 1 / 60
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class HandlerStats:
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.over_frame = 0
+        self.errors = 0
+        self.last_error = None
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if seconds > FRAME_SECONDS:
+            self.over_frame += 1
+
+    def copy(self):
+        other = copy.copy(self)
+        other.samples = list(self.samples)
+        return other
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            'calls': self.calls,
+            'p50_ms': percentile(ordered, 0.50) * 1000,
+            'p99_ms': percentile(ordered, 0.99) * 1000,
+            'max_ms': self.max * 1000,
+            'total_ms': self.total * 1000,
+            'over_frame': self.over_frame,
+            'errors': self.errors,
+            'last_error': self.last_error,
+        }
+
+
+class Profiler:
+    def __init__(self, window=2048):
+        self.window = window
+        self.enabled = True
+        self.stats = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def handler(self, name):
+        # Callers hold the lock
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = HandlerStats(self.window)
+        return stats
+
+    def record(self, name, seconds):
+        if self.enabled:
+            with self.lock:
+                self.handler(name).add(seconds)
+
+    def error(self, name, message):
+        with self.lock:
+            stats = self.handler(name)
+            stats.errors += 1
+            stats.last_error = message
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.started = time.time()
+
+    def snapshot(self):
+        # Copy under the lock, sort and summarize outside it
+        with self.lock:
+            copies = {name: stats.copy() for name, stats in self.stats.items()}
+        return {name: stats.summary() for name, stats in sorted(copies.items())}
+
+    def report(self):
+        lines = [f"{'handler':<28}{'calls':>7}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'>frame':>8}{'errors':>8}"]
+        for name, row in self.snapshot().items():
+            lines.append(f"{name:<28}{row['calls']:>7}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['max_ms']:>9.1f}"
+                         f"{row['over_frame']:>8}{row['errors']:>8}")
+        return "\n".join(lines)
+
+    def dump(self, path, **extra):
+        with open(path, 'w') as file:
+            json.dump({'started': self.started, 'dumped': time.time(), 'handlers': self.snapshot(), **extra}, file, indent=2)
+
+
+# One per process, the handlers all report here
+profiler = Profiler()
+
+
+def instrument(name=None):
+    """Decorator timing every call of a function under name (default: its own name).
+
+    Only for methods called directly or from signals whose arguments they take
+    in full; the wrapper takes *args, so PyQt would hand it e.g. clicked's bool."""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
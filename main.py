@@ -1,56 +1,191 @@
+import os
+import csv
 import sys
+import glob
+import time
+
+# Wall clock per startup phase, printed with --profile-startup
+startup_timings = {}
+startup_clock = time.perf_counter()
+
+
+def lap(name):
+    global startup_clock
+    now = time.perf_counter()
+    startup_timings[name] = now - startup_clock
+    startup_clock = now
+
+
+if __name__ == '__main__' and len(sys.argv) > 1:
+    # Headless commands (generate, fleet) exit before PyQt5 is ever imported
+    import cli
+    if sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.run(sys.argv[1:]))
+
 import yaml
-import re
-import qdarktheme
-from PyQt5.QtWidgets import QTabWidget, QApplication, QFileDialog, QTextEdit, QLabel, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QComboBox, QListWidget, QCheckBox, QLineEdit, QPushButton, QListWidgetItem
-from PyQt5.QtGui import QFont
+from serialization import dump_session
+from checklist import CatalogStore, ChecklistModel, DescriptionRenderer, load_checklist, saved_states
+from generator import env_text, format_mac_issues, generate_1u, generate_2u, generate_keyed, hosts_2u, rack_variables
+from importer import iter_lines, pair_by_key, read_host_map
+from topology import load_topologies
+from views import BackgroundTask, FirstPaint, MainStepListModel, NoteDocumentCache, OutputPane, PerfOverlay, SessionFinder, StallWatchdog, SubStepListModel
+from persistence import AutoSaveEngine, PersistenceWorker, atomic_write, journal_path, needs_recovery, open_session
+from session import RackSession, SessionAttribute
+from session_index import SessionIndex
+from instrumentation import instrument, profiler
+lap('import app modules')
+from PyQt5.QtWidgets import QTabWidget, QApplication, QFileDialog, QTextEdit, QLabel, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QComboBox, QListView, QLineEdit, QPushButton, QShortcut, QPlainTextEdit, QCheckBox
+from PyQt5.QtGui import QFont, QKeySequence
 from PyQt5.QtCore import QTimer
+lap('import PyQt5')
+
+AUTOSAVE_STEM = "delete-me-autosave"
+# What an unreadable, mis-encoded or malformed import file can raise
+IMPORT_ERRORS = (OSError, ValueError, csv.Error, yaml.YAMLError)
+
 
 class MyApp(QMainWindow):
+    # Per-rack state, read from and written to the rack currently shown
+    sys_var = SessionAttribute()
+    rack_var = SessionAttribute()
+    mtm_var = SessionAttribute()
+    plain_rack_var = SessionAttribute()
+    plain_sr_var = SessionAttribute()
+    mtor_var = SessionAttribute()
+    tor_var = SessionAttribute()
+    pdu_var = SessionAttribute()
+    bmc_var = SessionAttribute()
+    server_var = SessionAttribute()
+    sr_var = SessionAttribute()
+    hostlist1u = SessionAttribute()
+    user_notes = SessionAttribute()
+    checkbox_states = SessionAttribute()
+    u2_info_yaml_str = SessionAttribute()
+    u2_bmc_yaml_str = SessionAttribute()
+    u1_info_yaml_str = SessionAttribute()
+    u1_bmc_yaml_str = SessionAttribute()
+    loaded_session = SessionAttribute()
+    deferred_sections = SessionAttribute()
+    failed_sections = SessionAttribute()
+    save_engine = SessionAttribute()
+
     def __init__(self):
         super().__init__()
 
-        # Load steps from the default YAML file
-        with open("steps.yaml", 'r') as file:
-            data = yaml.safe_load(file)
-
-        self.steps = data["steps"]
-        self.sub_step_descriptions = data["sub_step_descriptions"]
+        # Load steps from the default YAML file (or its cached copy if it hasn't changed)
+        lap('create main window')
         self.load_steps_and_descriptions_from_yaml("steps.yaml")
+        lap('load steps.yaml (cached)' if self.steps_cache_hit else 'parse steps.yaml')
 
-        # Auto-save every second (1000 ms)
+        # Auto-save every second (1000 ms), only writes when something changed
+        # Serializing and writing happens on a background thread so typing never waits on disk
+        self.persistence_worker = PersistenceWorker()
+        # XCAT_AUTOSAVE_FORMAT=json switches the autosave to the faster compact JSON format
+        self.autosave_ext = os.environ.get("XCAT_AUTOSAVE_FORMAT", "yaml")
         self.auto_save_timer = QTimer(self)
         self.auto_save_timer.timeout.connect(self.auto_save)
         self.auto_save_timer.start(1000)  # time in milliseconds
+        # Sys/rack/MTM/completion of every saved session, for the Find dialog
+        self.session_index = SessionIndex()
 
         # Initialize stuff
-        self.checkbox_states = {main_step: [False]*len(sub_steps) for main_step, sub_steps in self.steps.items()}
-        self.main_step_items = []
-        self.sys_var = ""
-        self.rack_var = ""
-        self.plain_rack_var = ""
-        self.mtor_var = ""
-        self.tor_var = ""
-        self.pdu_var = ""
-        self.bmc_var = ""
-        self.server_var = ""
-        self.sr_var = ""
-        self.hostlist1u = ""
-        self.user_notes = {}
+        self.checklist = ChecklistModel(self.steps)  # Step index, list items and completion counters
+        # Every open rack; the window shows self.session
+        self.sessions = []
+        self.session = self.new_session()
         self.current_step_name = None
-        self.text_edit = QTextEdit()
-        self.text1_edit = QTextEdit()
-        self.env_text_edit = QTextEdit()
-        self.env1_text_edit = QTextEdit()
-        self.host_text_edit = QTextEdit()
-        self.host1_text_edit = QTextEdit()
-        self.mtm_var = ["SYS-2049U-TR4", "SR650", "NF5488M5", "SYS-1029U-TN10RT"]
-        self.u2_info_yaml_str = ""
-        self.u2_bmc_yaml_str = ""
-        self.u1_info_yaml_str = ""
-        self.u1_bmc_yaml_str = ""
+        self.tab2_built = False
+        self.tab3_built = False
+        self.mtm_options = ["SYS-2049U-TR4", "SR650", "NF5488M5", "SYS-1029U-TN10RT"]
+        self.mtm_options += [mtm for mtm in load_topologies().mtms() if mtm not in self.mtm_options]
+        self.descriptions.set_variables(self.template_variables())
+        lap('init state')
         
         self.initUI()
+        lap('build checklist tab')
+
+        # Closing cleanly writes a marked snapshot of every rack and leaves no journal,
+        # so an autosave with a journal or without the mark was left by a crash
+        autosaves = set(glob.glob(f"{AUTOSAVE_STEM}*.{self.autosave_ext}"))
+        autosaves.update(path[:-len(journal_path(""))] for path in glob.glob(journal_path(f"{AUTOSAVE_STEM}*.{self.autosave_ext}")))
+        for filename in sorted(autosaves):
+            if not needs_recovery(filename):
+                continue
+            first = self.sessions[0]
+            self.switch_session(first if filename == first.save_engine.filename else self.new_session(filename))
+            print(f"Recovering unsaved edits from {filename}")
+            self.load_session_from_file(filename)
+        if not os.path.exists(journal_path(self.sessions[0].save_engine.filename)):
+            # Edits are journaled from the first click on, they need this session's snapshot under them
+            try:
+                self.sessions[0].save_engine.write_snapshot(self.create_save_data(self.sessions[0]))
+            except ValueError as e:
+                print(f"Auto-save failed: {str(e)}")
+        self.switch_session(self.sessions[0])
+
+    def autosave_filename(self):
+        taken = {session.save_engine.filename for session in self.sessions}
+        number = 0
+        while True:
+            suffix = f"-{number}" if number else ""
+            filename = f"{AUTOSAVE_STEM}{suffix}.{self.autosave_ext}"
+            if filename not in taken:
+                return filename
+            number += 1
+
+    def new_session(self, filename=None):
+        # A rack costs its variables and progress lists, the widgets are shared
+        session = RackSession(AutoSaveEngine(filename or self.autosave_filename(), worker=self.persistence_worker))
+        self.checklist.load_states(session.checkbox_states)
+        session.done = self.checklist.done
+        session.bits = self.checklist.bits
+        if self.sessions:
+            self.checklist.use(self.session.checkbox_states, self.session.done, self.session.bits)
+        self.sessions.append(session)
+        return session
+
+    def load_progress(self, states):
+        self.checklist.load_states(states)
+        self.session.checkbox_states = self.checklist.states
+        self.session.done = self.checklist.done
+        self.session.bits = self.checklist.bits
+
+    def switch_session(self, session):
+        if session is self.session:
+            return
+        self.update_user_note()  # Notes typed so far belong to the rack being left
+        self.session = session
+        self.checklist.use(session.checkbox_states, session.done, session.bits)
+        self.note_documents.reset(self.user_notes)
+        self.descriptions.set_variables(self.template_variables())
+        self.show_session_inputs()
+        self.main_steps_model.refresh()
+        self.sub_steps_model.refresh()
+        if self.current_step_name is not None:
+            # Same sub-step, this rack's note and variables
+            self.display_sub_step_detail(self.current_step_name)
+        self.update_tabs()
+
+    def show_session_inputs(self):
+        self.sys_input.setText(self.sys_var)
+        self.rack_input.setText(self.rack_var)
+        if self.mtm_var in self.mtm_options:
+            self.mtm_input.setCurrentText(self.mtm_var)
+        self.rack_switcher.blockSignals(True)
+        self.rack_switcher.clear()
+        self.rack_switcher.addItems([session.label() for session in self.sessions])
+        self.rack_switcher.setCurrentIndex(self.sessions.index(self.session))
+        self.rack_switcher.blockSignals(False)
+
+    def on_rack_switched(self, index):
+        if 0 <= index < len(self.sessions):
+            self.switch_session(self.sessions[index])
+
+    def new_rack_clicked(self):
+        session = self.new_session()
+        # Lay a snapshot down before the first tick is journaled on top of an older rack's autosave
+        session.save_engine.write_snapshot(self.create_save_data(session))
+        self.switch_session(session)
 
     def initUI(self):
         self.setWindowTitle('xCat Checklist')
@@ -71,27 +206,45 @@ class MyApp(QMainWindow):
         # Add contents to the first tab
         self.configure_main_steps_tab()
         
-        # Add contents to the second tab
-        self.configure_tab2()
-        
-        # Add contents to the third tab
-        self.configure_tab3()
+        # The vi generator tabs get their contents the first time they're opened
+        self.tab_widget.currentChanged.connect(self.build_generator_tab)
 
         self.setCentralWidget(self.tab_widget)
 
+        # Ctrl+Shift+P shows handler p50/p99 and event loop lag; the lag watchdog only runs
+        # while the overlay is up or with --perf, --perf-json FILE writes the numbers on exit
+        self.perf_overlay = PerfOverlay(profiler, self)
+        self.stall_watchdog = StallWatchdog(profiler, self)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, activated=self.toggle_perf_overlay)
+        if "--perf" in sys.argv or "--perf-json" in sys.argv:
+            self.stall_watchdog.start()
+
+    def toggle_perf_overlay(self):
+        self.perf_overlay.toggle()
+        if self.perf_overlay.isVisible():
+            self.stall_watchdog.start()
+        elif "--perf" not in sys.argv and "--perf-json" not in sys.argv:
+            self.stall_watchdog.stop()
+
+    def build_generator_tab(self, index):
+        if index == 1 and not self.tab2_built:
+            self.tab2_built = True
+            self.configure_tab2()
+        elif index == 2 and not self.tab3_built:
+            self.tab3_built = True
+            self.configure_tab3()
+
     def configure_main_steps_tab(self):
         layout_h = QHBoxLayout()
         layout_left_v = QVBoxLayout()
         layout_right_v = QVBoxLayout()
 
-        # Left pane with list of main steps
-        self.main_steps_view = QListWidget()
-        for main_step in self.steps:
-            item = QListWidgetItem(main_step)
-            self.main_steps_view.addItem(item)
-            self.main_step_items.append(item)
-        
-        self.main_steps_view.itemClicked.connect(self.on_main_step_clicked)
+        # Left pane with list of main steps, rows are only materialized as they scroll into view
+        self.main_steps_model = MainStepListModel(self.checklist, self)
+        self.main_steps_view = QListView()
+        self.main_steps_view.setUniformItemSizes(True)
+        self.main_steps_view.setModel(self.main_steps_model)
+        self.main_steps_view.clicked.connect(self.on_main_step_clicked)
         layout_left_v.addWidget(self.main_steps_view)
 
         # Input and button line
@@ -101,15 +254,25 @@ class MyApp(QMainWindow):
         self.sys_label = QLabel("SYS-JIRA: ", self)
         self.rack_label = QLabel("Full Rack Name: ", self)
         self.mtm_label = QLabel("MTM: ", self)
-        self.mtm_input.addItems(self.mtm_var)
+        self.mtm_input.addItems(self.mtm_options)
         self.confirm_button = QPushButton("Confirm", self)
         self.confirm_button.clicked.connect(self.confirm_inputs)
         self.save_button = QPushButton("Save", self)
         self.save_button.clicked.connect(self.save_button_clicked)
         self.load_button = QPushButton("Load", self)
         self.load_button.clicked.connect(self.load_button_clicked)
+        # Open racks share this window, the combo switches between them
+        self.rack_switcher = QComboBox(self)
+        self.rack_switcher.addItem(self.session.label())
+        self.rack_switcher.currentIndexChanged.connect(self.on_rack_switched)
+        self.new_rack_button = QPushButton("New rack", self)
+        self.new_rack_button.clicked.connect(self.new_rack_clicked)
+        self.find_button = QPushButton("Find", self)
+        self.find_button.clicked.connect(self.find_button_clicked)
 
         layout_top_h = QHBoxLayout()
+        layout_top_h.addWidget(self.rack_switcher)
+        layout_top_h.addWidget(self.new_rack_button)
         layout_top_h.addWidget(self.sys_label)
         layout_top_h.addWidget(self.sys_input)
         layout_top_h.addWidget(self.rack_label)
@@ -119,11 +282,15 @@ class MyApp(QMainWindow):
         layout_top_h.addWidget(self.confirm_button)
         layout_top_h.addWidget(self.save_button)
         layout_top_h.addWidget(self.load_button)
-
-        # Right pane for sub steps
-        self.sub_steps_widget = QWidget()
-        self.sub_steps_layout = QVBoxLayout()
-        self.sub_steps_widget.setLayout(self.sub_steps_layout)
+        layout_top_h.addWidget(self.find_button)
+
+        # Right pane for sub steps, one checkable list whose rows come from checkbox_states
+        self.sub_steps_model = SubStepListModel(self.checklist, self)
+        self.sub_steps_model.sub_step_toggled.connect(self.on_checkbox_state_changed)
+        self.sub_steps_view = QListView()
+        self.sub_steps_view.setUniformItemSizes(True)
+        self.sub_steps_view.setModel(self.sub_steps_model)
+        self.sub_steps_view.clicked.connect(lambda index: self.display_sub_step_detail(index.data()))
         self.sub_step_detail_layout = QVBoxLayout()
 
         # Pre-create the QTextEdit widgets and add them to sub_step_detail_layout
@@ -134,10 +301,17 @@ class MyApp(QMainWindow):
         self.user_input_text = QTextEdit()
         self.user_input_text.setPlaceholderText("Your notes here...")
         self.sub_step_detail_layout.addWidget(self.user_input_text)
-        self.user_input_text.textChanged.connect(self.update_user_note)
+
+        # Notes live in per-step documents and are only read out after a pause in typing,
+        # on step switch and on save, not on every keystroke
+        self.note_documents = NoteDocumentCache(self.user_notes, self.on_note_edited, self)
+        self.note_capture_timer = QTimer(self)
+        self.note_capture_timer.setSingleShot(True)
+        self.note_capture_timer.setInterval(500)
+        self.note_capture_timer.timeout.connect(self.update_user_note)
 
         layout_right_v.addLayout(layout_top_h)
-        layout_right_v.addWidget(self.sub_steps_widget)
+        layout_right_v.addWidget(self.sub_steps_view)
         layout_right_v.addLayout(self.sub_step_detail_layout)
     
         layout_h.addLayout(layout_left_v, 1)
@@ -202,162 +376,177 @@ class MyApp(QMainWindow):
 
 ################################## TAB 1 ##################################
 
-    def on_main_step_clicked(self, item):
-        # Clear the current sub steps
-        while self.sub_steps_layout.count():
-            child = self.sub_steps_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-        # Display the new sub steps
-        main_step_name = item.text()
-        main_step = self.steps[main_step_name]
-        chk_states = self.checkbox_states[main_step_name]
-
-        for i, sub_step in enumerate(main_step):
-            chk_box = QCheckBox(sub_step)
-            chk_box.setChecked(chk_states[i])
-            chk_box.stateChanged.connect(lambda state, main_step=main_step_name, idx=i: self.on_checkbox_state_changed(main_step, idx, state))
-            chk_box.clicked.connect(lambda _, step=sub_step: self.display_sub_step_detail(step))  # Connect click event
-            self.sub_steps_layout.addWidget(chk_box)
-
-        self.sub_steps_layout.addStretch()
+    @instrument()
+    def on_main_step_clicked(self, index):
+        # Swap the sub step rows over to the new main step
+        self.sub_steps_model.set_main_step(index.data())
 
+    @instrument()
     def on_checkbox_state_changed(self, main_step, index, state):
         """Slot for checkbox state changed signal."""
-        self.checkbox_states[main_step][index] = bool(state)
-
-        # Check if all checkboxes for this main step are checked
-        if all(self.checkbox_states[main_step]):
-            font = self.main_step_items[list(self.steps.keys()).index(main_step)].font()
-            font.setStrikeOut(True)
-            self.main_step_items[list(self.steps.keys()).index(main_step)].setFont(font)
-        else:
-            font = self.main_step_items[list(self.steps.keys()).index(main_step)].font()
-            font.setStrikeOut(False)
-            self.main_step_items[list(self.steps.keys()).index(main_step)].setFont(font)
-        
+        # Only repaint the main step when all its checkboxes became (un)checked
+        if self.checklist.set_checked(main_step, index, bool(state)):
+            self.main_steps_model.step_changed(main_step)
+        # Journaled straight away, the tick itself doubles as the audit trail
+        self.save_engine.log_edit({'progress': {main_step: self.checklist.bits[main_step]},
+                                   'tick': [main_step, index, bool(state)]},
+                                  rack=self.rack_var, sys=self.sys_var)
+
     def confirm_inputs(self):
         self.sys_var = self.sys_input.text()
         self.rack_var = self.rack_input.text()
         self.mtm_var = self.mtm_input.currentText()
-        self.plain_rack_var = re.search(r'rk\d+', self.rack_var).group(0) if re.search(r'rk\d+', self.rack_var) else None
-        self.plain_sr_var = re.search(r'sr\d+', self.rack_var).group(0) if re.search(r'sr\d+', self.rack_var) else None
-
-        match = re.search(r'rk(\d+)', self.rack_var)
-        match_sr = re.search(r'sr(\d+)', self.rack_var)
-
-        if match:
-            r_value = match.group(1)
-            self.mtor_var = f'r{r_value}-mtor'
-            self.tor_var = f'r{r_value}-tor'
-            self.pdu_var = f'r{r_value}pdu'
-            self.bmc_var = f'r{r_value}bmc'
-            self.server_var = f'r{r_value}s'
-
-        if match_sr:
-            sr_value = match.group(1)
-            self.sr_var = f'r{sr_value}s'
 
+        variables = rack_variables(self.rack_var, self.mtm_var)
+        self.plain_rack_var = variables['plain_rack']
+        self.plain_sr_var = variables['plain_sr']
+        self.mtor_var = variables.get('mtor', self.mtor_var)
+        self.tor_var = variables.get('tor', self.tor_var)
+        self.pdu_var = variables.get('pdu', self.pdu_var)
+        self.bmc_var = variables.get('bmc', self.bmc_var)
+        self.server_var = variables.get('server', self.server_var)
+        self.sr_var = variables.get('sr', self.sr_var)
+
+        for key in ('sys_var', 'rack_var', 'mtm_var', 'plain_rack_var', 'mtor_var', 'tor_var', 'pdu_var', 'bmc_var', 'server_var'):
+            self.save_engine.mark_dirty(key)
+
+        self.descriptions.set_variables(self.template_variables())
+        self.show_session_inputs()  # New rack name in the switcher
         self.update_tabs()
 
     def load_steps_and_descriptions_from_yaml(self, file_path):
-        with open(file_path, 'r') as file:
-            data = yaml.safe_load(file)
-        
-        self.steps = data.get('steps', {})
-        self.sub_step_descriptions = data.get('sub_step_descriptions', {})
-
-    def auto_save(self):
+        checklist, self.steps_cache_hit = load_checklist(file_path)
+        self.steps = checklist['steps']
+        # Sessions point at this version instead of carrying their own copy of the steps
+        self.checklist_version = checklist['version']
+        self.catalog_store = CatalogStore()
+        self.catalog_store.put(self.checklist_version, self.steps)
+        self.sub_step_descriptions = checklist['sub_step_descriptions']
+        self.descriptions = DescriptionRenderer(checklist['templates'])
+        for problem in checklist['template_problems']:
+            print(f"{file_path}: {problem}")
+
+
+    @instrument()
+    def auto_save(self, force=False):
         try:
-            save_data = self.create_save_data()
-            yaml_str = self.serialize_save_data(save_data)
-            filename = "delete-me-autosave.yaml"
-            self.save_to_file(yaml_str, filename)
+            self.update_user_note()
+            # Every open rack in one pass, with one fsync for all the ticks and notes journaled since the last one
+            for session in self.sessions:
+                engine = session.save_engine
+                if not session.can_save():
+                    continue  # Reported when the section failed to parse
+                if engine.is_dirty() and (force or engine.should_flush()):
+                    engine.flush(self.create_save_data(session), force=force)
+            self.persistence_worker.submit_sync()
         except Exception as e:
             print(f"Auto-save failed: {str(e)}")
+            profiler.error('auto_save', str(e))
 
     def closeEvent(self, event):
         # Add logic here if you want to ask the user to confirm quitting.
         
-        # Save the current state
-        self.auto_save()
+        # Save the current state as a full snapshot of every rack, so no journal
+        # is left behind on a clean exit and the next start has nothing to recover
+        self.auto_save_timer.stop()
+        self.update_user_note()
+        for session in self.sessions:
+            if not session.can_save():
+                continue  # Its file and journal are left for the next start to recover
+            try:
+                session.save_engine.close(self.create_save_data(session))
+            except Exception as e:
+                print(f"Auto-save failed: {str(e)}")
+                profiler.error('auto_save', str(e))
+        self.persistence_worker.shutdown()  # Waits for the last snapshot to hit the disk
+        self.session_index.close()
+        if "--perf-json" in sys.argv:
+            index = sys.argv.index("--perf-json") + 1
+            path = sys.argv[index] if index < len(sys.argv) else "perf.json"
+            profiler.dump(path, startup={name: seconds * 1000 for name, seconds in startup_timings.items()})
         
         # Accept the event which will close the app
         event.accept()
 
 
+    def template_variables(self):
+        return {'sys': self.sys_var, 'rack': self.rack_var, 'mtm': self.mtm_var,
+                'plain_rack': self.plain_rack_var, 'mtor': self.mtor_var, 'tor': self.tor_var,
+                'pdu': self.pdu_var, 'bmc': self.bmc_var, 'server': self.server_var}
+
+    @instrument()
     def display_sub_step_detail(self, step_name):
-        # Fetch and format the predefined text
-        predef_text = self.sub_step_descriptions.get(step_name, "")
-        modified_text = predef_text.format(sys=self.sys_var, rack=self.rack_var, mtm=self.mtm_var, 
-                                        plain_rack=self.plain_rack_var, mtor=self.mtor_var, tor=self.tor_var, 
-                                        pdu=self.pdu_var, bmc=self.bmc_var, server=self.server_var)
+        # Fetch the predefined text, compiled at load time and cached until the rack variables change
+        modified_text = self.descriptions.render(step_name)
         
         # Add predefined details
         self.sub_step_detail_text.setPlainText(modified_text)
 
         # Update the current step name
+        self.update_user_note()
         self.current_step_name = step_name
-        user_note_widget = self.user_notes.get(step_name)
-        if user_note_widget is not None:
-            user_note = self.user_notes.get(step_name, "")
-            self.user_input_text.setPlainText(user_note)
-        else:
-            user_note = ""
-
-        self.user_input_text.setPlainText(user_note)
+        self.load_deferred('notes')
+        self.user_input_text.setDocument(self.note_documents.document(step_name))
         
-    def create_save_data(self):
-        save_data = {
-            'sys_var': self.sys_var,
-            'rack_var': self.rack_var,
-            'mtm_var': self.mtm_var,
-            'plain_rack_var' : self.plain_rack_var,
-            'mtor_var' : self.mtor_var,
-            'tor_var' : self.tor_var,
-            'pdu_var' : self.pdu_var,
-            'bmc_var' : self.bmc_var,
-            'server_var' : self.server_var,
-            'steps': self.steps,
-            'user_notes': self.user_notes,
-            'checkbox_states': self.checkbox_states,
-            'u2_info_yaml' : self.u2_info_yaml_str,
-            'u2_bmc_yaml' : self.u2_bmc_yaml_str,
-            'u1_info_yaml' : self.u1_info_yaml_str,
-            'u1_bmc_yaml' : self.u1_bmc_yaml_str,
-            'u1_hostlist' : self.hostlist1u
-            # Add more data when there's new stuff
-        }
-        return save_data
-
-    def serialize_save_data(self, save_data):
-        return yaml.dump(save_data)
+    def create_save_data(self, session=None):
+        if session is None or session is self.session:
+            session = self.session
+            # Notes have to go through load_deferred here, it swaps the note documents too
+            for name in list(self.deferred_sections):
+                self.load_deferred(name)
+        return session.save_data(self.checklist_version)
+
+    def serialize_save_data(self, save_data, filename):
+        return dump_session(save_data, filename)
 
     def save_to_file(self, yaml_str, filename):
-        with open(filename, 'w') as file:
-            file.write(yaml_str)
+        atomic_write(filename, yaml_str)
 
     def save_button_clicked(self):
-        save_data = self.create_save_data()
-        yaml_str = self.serialize_save_data(save_data)
+        self.update_user_note()
+        try:
+            save_data = self.create_save_data()
+        except ValueError as e:
+            print(f"Save failed: {str(e)}")
+            return
         filename = f"{self.sys_var}-{self.rack_var}.yaml"
-        self.save_to_file(yaml_str, filename)
+        self.persistence_worker.submit_snapshot(filename, save_data, writer=self.write_session_file)
+
+    def write_session_file(self, filename, save_data):
+        # Runs on the persistence worker thread, so no widget access in here
+        self.save_to_file(self.serialize_save_data(save_data, filename), filename)
+        self.session_index.record(filename, save_data)
 
     def load_button_clicked(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Load session", "", "YAML Files (*.yaml)")
+        filename, _ = QFileDialog.getOpenFileName(self, "Load session", "", "Session Files (*.yaml *.json)")
         if filename:
             self.load_session_from_file(filename)
 
+    def find_button_clicked(self):
+        # Only files changed since the last look get parsed, the rest is a stat each
+        self.session_index.rebuild(".")
+        finder = SessionFinder(self.session_index, self)
+        if finder.exec_() and finder.selected_path:
+            self.load_session_from_file(finder.selected_path)
+
+    def on_note_edited(self, step_name):
+        # Restart the debounce, the text is read out once typing pauses
+        self.note_capture_timer.start()
+
     def update_user_note(self):
-        if self.current_step_name is not None:
-            self.user_notes[self.current_step_name] = self.user_input_text.toPlainText()
-            # print(f"Updated note for {self.current_step_name}: {self.user_notes[self.current_step_name]}")
+        self.note_capture_timer.stop()
+        captured = self.note_documents.capture()
+        if captured:
+            self.save_engine.log_edit({'user_notes': {step_name: self.user_notes[step_name] for step_name in captured}},
+                                      rack=self.rack_var, sys=self.sys_var)
 
+    @instrument()
     def load_session_from_file(self, filename):
         try:
-            with open(filename, 'r') as file:
-                data = yaml.safe_load(file)
+            # Only the header (rack variables, checkbox states) is parsed here; notes and
+            # generated documents follow on first use. Journal entries are picked up too.
+            saved = open_session(filename)
+            data = saved.header()
 
             # Apply loaded settings
             self.sys_var = data.get('sys_var', "")
@@ -369,70 +558,84 @@ class MyApp(QMainWindow):
             self.pdu_var = data.get('pdu_var', "")
             self.bmc_var = data.get('bmc_var', "")
             self.server_var = data.get('server_var', "")
-            loaded_user_notes = data.get('user_notes', {})
-            self.user_notes = loaded_user_notes  # Since these are plain strings, no need for QTextEdits here
-            self.checkbox_states = data.get('checkbox_states', {})
-            self.u2_info_yaml_str = data.get('u2_info_yaml', "")
-            self.u2_bmc_yaml_str = data.get('u2_bmc_yaml', "")
-            self.u1_info_yaml_str = data.get('u1_info_yaml', "")
-            self.u1_bmc_yaml_str = data.get('u1_bmc_yaml', "")
-            self.hostlist1u = data.get('u1_hostlist', "")
+            self.loaded_session = saved
+            self.deferred_sections = {'notes', 'outputs'}
+            self.failed_sections = set()
+            self.user_notes = {}
+            self.note_documents.reset(self.user_notes)
+            if self.current_step_name is not None:
+                self.load_deferred('notes')
+                self.user_input_text.setDocument(self.note_documents.document(self.current_step_name))
+            states, note = saved_states(saved, self.steps, self.checklist_version, self.catalog_store)
+            if note:
+                print(f"{filename}: {note}")
+            self.load_progress(states)
+            self.main_steps_model.refresh()
+            self.sub_steps_model.refresh()
+            self.descriptions.set_variables(self.template_variables())
+            self.save_engine.mark_all_dirty()
+            # Parse the rest in the background; whatever the UI asks for first is parsed on the spot
+            self.persistence_worker.submit_job(saved.load_all)
 
             # Assume 'main_step_name' is correctly acquired from UI or data. Otherwise, modify as needed.
-            main_step_name = (
-                self.main_steps_view.currentItem().text() 
-                if self.main_steps_view.currentItem() 
-                else None
-            )
+            current_index = self.main_steps_view.currentIndex()
+            main_step_name = current_index.data() if current_index.isValid() else None
             if main_step_name:
                 # Regenerate sub-steps UI to reflect loaded checkbox states
-                self.on_main_step_clicked(self.main_steps_view.currentItem())
+                self.on_main_step_clicked(current_index)
                 
             # Update UI Elements with Loaded Data
-            self.sys_input.setText(self.sys_var)
-            self.rack_input.setText(self.rack_var)
-
-            for step_name, note in loaded_user_notes.items():
-                if step_name in self.user_notes:
-                    self.user_notes[step_name].setPlainText(note)
-                else:
-                    text_edit = QTextEdit(self)
-                    text_edit.setPlainText(note)
-                    self.user_notes[step_name] = text_edit
-
-            current_item = self.main_steps_view.currentItem()
-            if current_item:
-                self.on_main_step_clicked(current_item)
+            self.show_session_inputs()
+
+            current_index = self.main_steps_view.currentIndex()
+            if current_index.isValid():
+                self.on_main_step_clicked(current_index)
                     
         except FileNotFoundError:
             print(f"Error: File {filename} not found.")
+            profiler.error('load_session_from_file', f"{filename} not found")
         except yaml.YAMLError as ye:
             print(f"Error parsing YAML file {filename}: {str(ye)}")
+            profiler.error('load_session_from_file', str(ye))
         except Exception as e:
             print(f"Unexpected error loading session from {filename}: {str(e)}")
+            profiler.error('load_session_from_file', str(e))
 
         self.update_tabs()
-        self.configure_envvar_sub_tab(self)
+
+    def load_deferred(self, name):
+        if self.session.load_deferred(name) and name == 'notes':
+            self.note_documents.reset(self.user_notes)
+
+    def output_text(self, attr):
+        # Source for the output panes, so a loaded session's documents are parsed when first shown
+        self.load_deferred('outputs')
+        return getattr(self, attr)
 
 ################################## TAB 1 ##################################
 ################################## TAB 2 ##################################
 
+    @instrument()
     def update_tabs(self):
-        # Update tab names based on new variable values
-        self.sub_tab_widget.setTabText(2, f"{self.rack_var}-info.yaml")
-        self.sub_tab_widget.setTabText(3, f"{self.plain_rack_var}.txt")
-        self.sub_tab_widget.setTabText(4, f"{self.plain_rack_var}bmc.txt")
-        self.sub_1u_tab_widget.setTabText(2, f"{self.rack_var}-info.yaml")
-        self.sub_1u_tab_widget.setTabText(3, f"{self.plain_rack_var}.txt")
-        self.sub_1u_tab_widget.setTabText(4, f"{self.plain_rack_var}bmc.txt")
-        self.update_env_text_edit()
-        self.update_host_text_edit()
-        self.update_1u_env_text_edit()
-        self.update_1u_host_text_edit()
-        self.u2_bmc_output_text_edit.setText(self.u2_bmc_yaml_str)
-        self.u2_info_output_text_edit.setText(self.u2_info_yaml_str)
-        self.u1_bmc_output_text_edit.setText(self.u1_bmc_yaml_str)
-        self.u1_info_output_text_edit.setText(self.u1_info_yaml_str) # Confirm button won't update the original concent here but it's a massive pain to fix that
+        # Generator tabs that haven't been opened yet pick the values up when they're built
+        if self.tab2_built:
+            # Update tab names based on new variable values
+            self.sub_tab_widget.setTabText(2, f"{self.rack_var}-info.yaml")
+            self.sub_tab_widget.setTabText(3, f"{self.plain_rack_var}.txt")
+            self.sub_tab_widget.setTabText(4, f"{self.plain_rack_var}bmc.txt")
+            # Cheap: the panes just get marked stale and re-render once someone looks at them
+            self.update_env_text_edit()
+            self.update_host_text_edit()
+            self.u2_bmc_output_text_edit.invalidate()
+            self.u2_info_output_text_edit.invalidate()
+        if self.tab3_built:
+            self.sub_1u_tab_widget.setTabText(2, f"{self.rack_var}-info.yaml")
+            self.sub_1u_tab_widget.setTabText(3, f"{self.plain_rack_var}.txt")
+            self.sub_1u_tab_widget.setTabText(4, f"{self.plain_rack_var}bmc.txt")
+            self.update_1u_env_text_edit()
+            self.update_1u_host_text_edit()
+            self.u1_bmc_output_text_edit.invalidate()
+            self.u1_info_output_text_edit.invalidate() # Confirm button won't update the original concent here but it's a massive pain to fix that
 
     def configure_input_sub_tab(self, sub_tab):
         layout_v = QVBoxLayout(sub_tab)
@@ -475,9 +678,17 @@ class MyApp(QMainWindow):
         clear_button = QPushButton("Clear", self)
         layout_h_buttons.addWidget(clear_button)
 
+        # Add an "Import files" button, streams big exports without pasting them in here
+        import_button = QPushButton("Import files...", self)
+        layout_h_buttons.addWidget(import_button)
+        # Imported lines start with their host or serial and are joined on it
+        self.by_key_check = QCheckBox("Pair by key", self)
+        layout_h_buttons.addWidget(self.by_key_check)
+
         # Connect the buttons to their respective slots
         save_button.clicked.connect(self.save_text)
         clear_button.clicked.connect(self.clear_text)
+        import_button.clicked.connect(self.import_files)
 
         # Add horizontal layouts to the vertical layout
         layout_v.addLayout(layout_h_text)
@@ -488,39 +699,64 @@ class MyApp(QMainWindow):
         # Retrieve text from the input boxes and save/process it as needed
         macs = self.mac_input.toPlainText().split('\n')
         pws = self.pw_input.toPlainText().split('\n')
-        hosts = self.host_text_edit.toPlainText().split('\n')
-        reversed_hosts = hosts[::-1]
-        mtms = self.mtm_input.currentText()
-        data = {}
-        clean_macs = [self.format_mac(mac) for mac in macs if len(mac.strip()) >= 5]
-        clean_pws = [pw.strip().replace('"', '').replace('\'', '').replace('\n', '') for pw in pws if len(pw.strip()) >= 5]
-
-        for host, mac, pw in zip(reversed_hosts, clean_macs, clean_pws):
-            key = f"{host}-bmc"
-            data[key] = {
-                'mac': mac,
-                'password': pw,
-                'mtm': mtms,
-            }
-
-        sorted_data = {k: data[k] for k in sorted(data, reverse=True)}
-        self.u2_info_yaml_str = yaml.dump(sorted_data, sort_keys=False)  # 'sort_keys=False' is important to preserve order in YAML
-        self.u2_info_output_text_edit.setText(self.u2_info_yaml_str)
-
-        bmc_data = {'bmc': {}}
-        for host, pw in zip(reversed_hosts, clean_pws):
-            bmc_data['bmc'][host] = {
-                'vendor_password': pw
-            }
-
-        self.u2_bmc_yaml_str = yaml.dump(bmc_data)
-        self.u2_bmc_output_text_edit.setText(self.u2_bmc_yaml_str)
-
-    def format_mac(self, mac):
-        mac = mac.replace(':', '').replace('-', '').replace('.', '').upper()
-        if len(mac) != 12:
-            return 'INVALID'  # or some other form of error indication
-        return ':'.join(mac[i:i+2] for i in range(0, len(mac), 2))
+        # The confirmed MTM, not the combo's current text, so the hosts match the host pane
+        outputs = generate_2u(self.rack_var, macs, pws, self.mtm_var)
+        self.show_2u_outputs(outputs)
+
+    def import_files(self):
+        if self.by_key_check.isChecked():
+            outputs = self.import_keyed('2u')
+            if outputs is not None:
+                self.show_2u_outputs(outputs)
+            return
+        mac_file, _ = QFileDialog.getOpenFileName(self, "MAC list", "", "Text Files (*.txt *.csv);;All Files (*)")
+        if not mac_file:
+            return
+        pw_file, _ = QFileDialog.getOpenFileName(self, "Password list", "", "Text Files (*.txt *.csv);;All Files (*)")
+        if not pw_file:
+            return
+        try:
+            outputs = generate_2u(self.rack_var, iter_lines(mac_file), iter_lines(pw_file), self.mtm_var)
+        except IMPORT_ERRORS as e:
+            print(f"Import failed: {str(e)}")
+            return
+        self.show_2u_outputs(outputs)
+
+    def import_keyed(self, form):
+        """Generates from "<key> <value>" MAC and password files joined on the key, None if cancelled or failed."""
+        files = []
+        for title in ("MAC list (<host> <mac> lines)", "Password list (<host> <password> lines)"):
+            filename, _ = QFileDialog.getOpenFileName(self, title, "", "Text Files (*.txt *.csv);;All Files (*)")
+            if not filename:
+                return None
+            files.append(filename)
+        # Only needed when the lines are keyed by serial number
+        map_file, _ = QFileDialog.getOpenFileName(self, "Serial to host map (<serial> <host> lines), cancel if keyed by host", "",
+                                                  "Text Files (*.txt *.csv);;All Files (*)")
+        unmatched = []
+        try:
+            host_map = read_host_map(iter_lines(map_file)) if map_file else None
+            pairs = pair_by_key(iter_lines(files[0]), iter_lines(files[1]), unmatched)
+            outputs = generate_keyed(self.rack_var, pairs, self.mtm_var, form, host_map)
+        except IMPORT_ERRORS as e:
+            print(f"Import failed: {str(e)}")
+            return None
+        for line in unmatched:
+            print(line)
+        return outputs
+
+    def show_2u_outputs(self, outputs):
+        for line in format_mac_issues(outputs['mac_issues']):
+            print(line)
+
+        self.load_deferred('outputs')  # So the loaded documents can't land on top of these later
+        self.u2_info_yaml_str = outputs['info']
+        self.u2_info_output_text_edit.invalidate()
+        self.save_engine.mark_dirty('u2_info_yaml')
+
+        self.u2_bmc_yaml_str = outputs['bmc']
+        self.u2_bmc_output_text_edit.invalidate()
+        self.save_engine.mark_dirty('u2_bmc_yaml')
 
     def clear_text(self):
         # Clear the input boxes
@@ -534,8 +770,8 @@ class MyApp(QMainWindow):
         left_vbox_layout = QVBoxLayout()
         right_vbox_layout = QVBoxLayout()
 
-        self.env_text_edit.setReadOnly(True)
-        self.update_env_text_edit()
+        # Generated outputs only render when their tab is shown
+        self.env_text_edit = OutputPane(lambda: env_text(self.env_variables()))
         left_vbox_layout.addWidget(self.env_text_edit)
 
         # self.env_text_edit2.setReadOnly(True)
@@ -551,14 +787,12 @@ class MyApp(QMainWindow):
         main_layout.addLayout(hbox_layout)
         sub_tab.setLayout(main_layout)
 
+    def env_variables(self):
+        return {'mtor': self.mtor_var, 'tor': self.tor_var, 'pdu': self.pdu_var, 'bmc': self.bmc_var, 'server': self.server_var}
+
     def update_env_text_edit(self):
         # Update text_edit text based on variable values
-        self.env_text_edit.setText(f"""export MTOR={self.mtor_var}
-export TOR={self.tor_var}
-export PDU={self.pdu_var}
-export BMC={self.bmc_var}
-export SERVER={self.server_var}
-""")
+        self.env_text_edit.invalidate()
         
 #     def update_env_text_edit2(self):
 #         # Update text_edit text based on variable values
@@ -571,38 +805,55 @@ export SERVER={self.server_var}
 
     def configure_info_sub_tab(self, sub_tab):
         layout = QVBoxLayout(sub_tab)
-        self.u2_info_output_text_edit = QTextEdit(self)
-        self.u2_info_output_text_edit.setReadOnly(True)
+        self.u2_info_output_text_edit = OutputPane(lambda: self.output_text('u2_info_yaml_str'), self)
         layout.addWidget(self.u2_info_output_text_edit)
         # sub_tab.setLayout(layout)
 
     def configure_host_sub_tab(self, sub_tab):
         layout = QVBoxLayout(sub_tab)
-        self.host_text_edit.setReadOnly(True)
-        self.update_host_text_edit()
+        self.host_text_edit = OutputPane(lambda: "\n".join(hosts_2u(self.rack_var, self.mtm_var)))
         layout.addWidget(self.host_text_edit)
 
     def update_host_text_edit(self):
-        excluded = {22, 24, 26}
-        output_servers = []
-
-        for i in range(2, 51, 2):
-            if i in excluded:
-                continue
-            output_servers.append(f"{self.rack_var}-s{i:02d}")
-            if len(output_servers) == 22:
-                break
-        
-        output_text = "\n".join(output_servers)
-        self.host_text_edit.setText(output_text)
+        self.host_text_edit.invalidate()
 
     def configure_bmc_sub_tab(self, sub_tab):
         layout = QVBoxLayout(sub_tab)
-        self.u2_bmc_output_text_edit = QTextEdit(self)
-        self.u2_bmc_output_text_edit.setReadOnly(True)
+        self.u2_bmc_output_text_edit = OutputPane(lambda: self.output_text('u2_bmc_yaml_str'), self)
         layout.addWidget(self.u2_bmc_output_text_edit)
+        self.add_bmc_validation(layout, 'u2_info_yaml_str')
         # sub_tab.setLayout(layout)
 
+    def add_bmc_validation(self, layout, info_attr):
+        # Probes every BMC of the generated info document off the UI thread, results show below
+        button = QPushButton("Validate BMCs", self)
+        results = QPlainTextEdit(self)
+        results.setReadOnly(True)
+        results.setMaximumHeight(220)
+        results.setPlaceholderText("Reachability (TCP) and credential (Redfish) checks per BMC")
+        button.clicked.connect(lambda: self.validate_bmcs(self.output_text(info_attr), button, results))
+        layout.addWidget(button)
+        layout.addWidget(results)
+
+    def validate_bmcs(self, info_yaml, button, results):
+        # asyncio and ssl only load once someone validates
+        from bmc_check import Prober, targets_from_info
+        targets = targets_from_info(info_yaml)
+        if not targets:
+            results.setPlainText("Nothing to validate, generate the rack's outputs first.")
+            return
+        button.setEnabled(False)
+        results.setPlainText(f"Probing {len(targets)} BMCs...")
+        prober = Prober(user=os.environ.get("XCAT_BMC_USER", "ADMIN"))
+        task = BackgroundTask(lambda: prober.probe_all(targets)[1], self)
+
+        def done(text):
+            results.setPlainText(f"Validation failed: {str(text)}" if isinstance(text, Exception) else text)
+            button.setEnabled(True)
+            task.deleteLater()
+        task.finished.connect(done)
+        task.start()
+
 ################################## TAB 2 ##################################
 ################################## TAB 3 ##################################
 
@@ -659,9 +910,16 @@ export SERVER={self.server_var}
         clear_button = QPushButton("Clear", self)
         layout_h_buttons.addWidget(clear_button)
 
+        # Add an "Import files" button, streams big exports without pasting them in here
+        import_button = QPushButton("Import files...", self)
+        layout_h_buttons.addWidget(import_button)
+        self.by_key1_check = QCheckBox("Pair by key", self)
+        layout_h_buttons.addWidget(self.by_key1_check)
+
         # Connect the buttons to their respective slots
         save_button.clicked.connect(self.save_1u_text)
         clear_button.clicked.connect(self.clear_1u_text)
+        import_button.clicked.connect(self.import_1u_files)
 
         # Add horizontal layouts to the vertical layout
         layout_v.addLayout(layout_h_text)
@@ -671,46 +929,46 @@ export SERVER={self.server_var}
     def save_1u_text(self):
         # Retrieve text from the input boxes and save/process it as needed
         hostlist = self.hostlist_input.toPlainText().split('\n')
-        rereversed_hostlist = hostlist[::-1]
         macs = self.mac1_input.toPlainText().split('\n')
         pws = self.pw1_input.toPlainText().split('\n')
-        mtms = self.mtm_input.currentText()
-        data = {}
-        clean_hosts = [self.rack_var + "-" + host for host in hostlist if host.strip()]
-        clean_rereversed_hosts = [self.rack_var + "-" + host for host in rereversed_hostlist if host.strip()]
-        clean_macs = [self.format_mac(mac) for mac in macs if len(mac.strip()) >= 5]
-        clean_pws = [pw.strip().replace('"', '').replace('\'', '').replace('\n', '') for pw in pws if len(pw.strip()) >= 5]
-
-        for host, mac, pw in zip(clean_hosts, clean_macs, clean_pws):
-            key = f"{host}-bmc"
-            data[key] = {
-                'mac': mac,
-                'password': pw,
-                'mtm': mtms,
-            }
-
-        self.u1_info_yaml_str = yaml.dump(data, sort_keys=False)  # 'sort_keys=False' is important to preserve order in YAML
-        self.u1_info_output_text_edit.setText(self.u1_info_yaml_str)
-
-        bmc_data = {'bmc': {}}
-        for host, pw in zip(clean_rereversed_hosts, clean_pws):
-            bmc_data['bmc'][host] = {
-                'vendor_password': pw
-            }
-
-        self.u1_bmc_yaml_str = yaml.dump(bmc_data, sort_keys=False)
-        self.u1_bmc_output_text_edit.setText(self.u1_bmc_yaml_str)
-
-        # self.hostlist1u = yaml.dump(clean_hosts)
-        # self.host1_text_edit.setText(self.hostlist1u)
-        self.hostlist1u = clean_rereversed_hosts #giving up on this for now
-        self.host1_text_edit.setText('\n'.join(self.hostlist1u))
-
-    def format_1u_mac(self, mac):
-        mac = mac.replace(':', '').replace('-', '').replace('.', '').upper()
-        if len(mac) != 12:
-            return 'INVALID'  # or some other form of error indication
-        return ':'.join(mac[i:i+2] for i in range(0, len(mac), 2))
+        outputs = generate_1u(self.rack_var, hostlist, macs, pws, self.mtm_var)
+        self.show_1u_outputs(outputs)
+
+    def import_1u_files(self):
+        if self.by_key1_check.isChecked():
+            outputs = self.import_keyed('1u')
+            if outputs is not None:
+                self.show_1u_outputs(outputs)
+            return
+        files = []
+        for title in ("Host list", "MAC list", "Password list"):
+            filename, _ = QFileDialog.getOpenFileName(self, title, "", "Text Files (*.txt *.csv);;All Files (*)")
+            if not filename:
+                return
+            files.append(filename)
+        try:
+            outputs = generate_1u(self.rack_var, *(iter_lines(filename) for filename in files), self.mtm_var)
+        except IMPORT_ERRORS as e:
+            print(f"Import failed: {str(e)}")
+            return
+        self.show_1u_outputs(outputs)
+
+    def show_1u_outputs(self, outputs):
+        for line in format_mac_issues(outputs['mac_issues']):
+            print(line)
+
+        self.load_deferred('outputs')
+        self.u1_info_yaml_str = outputs['info']
+        self.u1_info_output_text_edit.invalidate()
+        self.save_engine.mark_dirty('u1_info_yaml')
+
+        self.u1_bmc_yaml_str = outputs['bmc']
+        self.u1_bmc_output_text_edit.invalidate()
+        self.save_engine.mark_dirty('u1_bmc_yaml')
+
+        self.hostlist1u = outputs['hostlist'] #giving up on this for now
+        self.host1_text_edit.invalidate()
+        self.save_engine.mark_dirty('u1_hostlist')
 
     def clear_1u_text(self):
         # Clear the input boxes
@@ -725,8 +983,7 @@ export SERVER={self.server_var}
         left_vbox_layout = QVBoxLayout()
         right_vbox_layout = QVBoxLayout()
 
-        self.env1_text_edit.setReadOnly(True)
-        self.update_1u_env_text_edit()
+        self.env1_text_edit = OutputPane(lambda: env_text(self.env_variables()))
         left_vbox_layout.addWidget(self.env1_text_edit)
 
         hbox_layout.addLayout(left_vbox_layout)
@@ -740,41 +997,55 @@ export SERVER={self.server_var}
 
     def update_1u_env_text_edit(self):
         # Update text_edit text based on variable values
-        self.env1_text_edit.setText(f"""export MTOR={self.mtor_var}
-export TOR={self.tor_var}
-export PDU={self.pdu_var}
-export BMC={self.bmc_var}
-export SERVER={self.server_var}
-""")
+        self.env1_text_edit.invalidate()
 
     def configure_1u_info_sub_tab(self, sub_tab):
         layout = QVBoxLayout(sub_tab)
-        self.u1_info_output_text_edit = QTextEdit(self)
-        self.u1_info_output_text_edit.setReadOnly(True)
+        self.u1_info_output_text_edit = OutputPane(lambda: self.output_text('u1_info_yaml_str'), self)
         layout.addWidget(self.u1_info_output_text_edit)
 
     def configure_1u_host_sub_tab(self, sub_tab):
         layout = QVBoxLayout(sub_tab)
-        self.host1_text_edit.setReadOnly(True)
-        self.update_1u_host_text_edit()
+        self.host1_text_edit = OutputPane(lambda: '\n'.join(self.output_text('hostlist1u')))
         layout.addWidget(self.host1_text_edit)
 
     def update_1u_host_text_edit(self):
-        self.host1_text_edit.setText('\n'.join(self.hostlist1u)) #giving up on this for now
+        self.host1_text_edit.invalidate() #giving up on this for now
 
     def configure_1u_bmc_sub_tab(self, sub_tab):
         layout = QVBoxLayout(sub_tab)
-        self.u1_bmc_output_text_edit = QTextEdit(self)
-        self.u1_bmc_output_text_edit.setReadOnly(True)
+        self.u1_bmc_output_text_edit = OutputPane(lambda: self.output_text('u1_bmc_yaml_str'), self)
         layout.addWidget(self.u1_bmc_output_text_edit)
+        self.add_bmc_validation(layout, 'u1_info_yaml_str')
 
 ################################## TAB 3 ##################################
 
+def print_startup_timings():
+    total = sum(startup_timings.values())
+    for name, seconds in startup_timings.items():
+        print(f"{name:<32}{seconds * 1000:>9.1f} ms")
+    print(f"{'total':<32}{total * 1000:>9.1f} ms")
+
+
+def finish_startup():
+    # Runs once the window has been painted; theme detection isn't worth delaying that for
+    lap('first paint')
+    import qdarktheme
+    lap('import qdarktheme')
+    qdarktheme.setup_theme("auto")
+    lap('apply theme')
+    if "--profile-startup" in sys.argv:
+        print_startup_timings()
+
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    qdarktheme.setup_theme("auto")
     font = QFont("Lucida Sans", 9)
     app.setFont(font)
+    lap('create QApplication')
     ex = MyApp()
+    # Theme and timings wait for the window's first frame, not just the first event loop pass
+    FirstPaint(ex, finish_startup)
     ex.showMaximized()
+    lap('show window')
     sys.exit(app.exec_())
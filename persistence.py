@@ -0,0 +1,429 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import profiler
+from serialization import SECTION_KEYS, SECTIONS_HEADER_KEY, dump_session, parse_session_section, read_session_header, read_session_sections
+
+# Keys of the session dict that are saved per entry instead of as a whole
+# (checkbox_states is only in sessions saved before progress bitsets)
+MERGED_SECTIONS = ('user_notes', 'progress', 'checkbox_states')
+# Audit fields of journal records, when, on which rack and what was clicked; not session data
+JOURNAL_META = ('at', 'rack', 'sys', 'tick')
+# Header key of the snapshot written on a clean exit; an autosave without it was left by a crash
+CLEAN_EXIT_KEY = 'closed_cleanly'
+# The history file is rotated once it passes this size, keeping this many old ones
+HISTORY_MAX_BYTES = 4 << 20
+HISTORY_KEEP = 3
+
+
+# Read once at import; os.umask can only be read by setting it, which isn't
+# safe to do from the persistence worker while other threads create files
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def file_mode(filename):
+    # Keep an existing file's permissions, new files get what open() would give them
+    try:
+        return os.stat(filename).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def atomic_write(filename, text):
+    # Write to a temp file next to the target and rename it over the original,
+    # so a crash mid-write never leaves a truncated file behind
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".part", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as file:
+            # mkstemp files are 0600
+            os.fchmod(file.fileno(), file_mode(filename))
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def journal_path(filename):
+    return filename + ".journal"
+
+
+def history_path(filename):
+    return filename + ".history"
+
+
+def read_journal(filename):
+    # Each line is one JSON record; a line torn by a crash is skipped
+    records = []
+    try:
+        with open(journal_path(filename), 'r') as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def apply_record(data, record):
+    for key, value in record.items():
+        if key in JOURNAL_META:
+            continue
+        if key in MERGED_SECTIONS:
+            data.setdefault(key, {}).update(value)
+        else:
+            data[key] = value
+    return data
+
+
+def freeze(value):
+    # Copy the mutable containers so the UI can keep editing while a worker
+    # serializes; strings and bools are immutable and shared as-is
+    if isinstance(value, dict):
+        return {k: freeze(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [freeze(v) for v in value]
+    return value
+
+
+def rotate_history(filename, max_bytes=HISTORY_MAX_BYTES, keep=HISTORY_KEEP):
+    # .history -> .history.1 -> .history.2 ..., the oldest one is dropped
+    path = history_path(filename)
+    try:
+        if os.path.getsize(path) < max_bytes:
+            return
+    except FileNotFoundError:
+        return
+    for i in range(keep - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def retire_journal(filename, save_data=None):
+    # The snapshot now holds everything the journal did; the records move on
+    # to the history file, which keeps the trail of when each step was ticked.
+    # The autosave slot is reused by other racks, so every record names its rack.
+    if not os.path.exists(journal_path(filename)):
+        return
+    records = read_journal(filename)
+    save_data = save_data or {}
+    audit = {'rack': str(save_data.get('rack_var', "")), 'sys': str(save_data.get('sys_var', ""))}
+    rotate_history(filename)
+    with open(history_path(filename), 'a') as history:
+        for record in records:
+            history.write(json.dumps({**audit, **record}) + "\n")
+    os.remove(journal_path(filename))
+
+
+def write_snapshot_file(filename, save_data):
+    atomic_write(filename, dump_session(save_data, filename))
+    retire_journal(filename, save_data)
+
+
+def needs_recovery(filename):
+    """True when the last run didn't close this autosave cleanly: a journal is
+    left over, or the snapshot isn't the one written on exit."""
+    if os.path.exists(journal_path(filename)):
+        return True
+    try:
+        header, _ = read_session_header(filename)
+    except FileNotFoundError:
+        return False
+    except Exception:
+        return True  # Let loading it report what's wrong
+    return not (isinstance(header, dict) and header.get(CLEAN_EXIT_KEY))
+
+
+def append_journal_record(filename, record):
+    with open(journal_path(filename), 'a') as file:
+        file.write(json.dumps(record) + "\n")
+
+
+class JournalWriter:
+    """Keeps journals open for appending. Every record reaches the OS right
+    away, so a crash of the app loses nothing; fsync waits for sync(), so one
+    disk flush covers a whole burst of edits."""
+
+    def __init__(self):
+        self.files = {}
+        self.unsynced = set()
+
+    def append(self, filename, record):
+        file = self.files.get(filename)
+        if file is None:
+            file = self.files[filename] = open(journal_path(filename), 'ab+')
+            if file.tell() > 0:
+                # Start on a fresh line if the last run died mid-record
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
+        file.write(json.dumps(record).encode() + b"\n")
+        file.flush()
+        self.unsynced.add(filename)
+
+    def sync(self):
+        for filename in self.unsynced:
+            os.fsync(self.files[filename].fileno())
+        self.unsynced.clear()
+
+    def close(self, filename):
+        file = self.files.pop(filename, None)
+        if file is not None:
+            if filename in self.unsynced:
+                os.fsync(file.fileno())
+                self.unsynced.discard(filename)
+            file.close()
+
+
+class PersistenceWorker:
+    """Serializes and writes session snapshots on a background thread.
+
+    A single worker thread runs jobs in submission order, and a snapshot that
+    has been superseded by a newer one for the same file is skipped, so an
+    older session can never overwrite a newer one."""
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.latest = {}  # filename -> seq of the newest snapshot submitted
+        self.journal = JournalWriter()  # Only touched from the worker thread
+
+    def submit_snapshot(self, filename, save_data, writer=write_snapshot_file):
+        with self.lock:
+            self.seq += 1
+            seq = self.seq
+            self.latest[filename] = seq
+        return self.executor.submit(self.run_snapshot, filename, seq, freeze(save_data), writer)
+
+    def submit_append(self, filename, record):
+        return self.executor.submit(self.run_job, self.journal.append, filename, freeze(record))
+
+    def submit_sync(self):
+        return self.executor.submit(self.run_job, self.journal.sync)
+
+    def submit_job(self, func, *args):
+        return self.executor.submit(self.run_job, func, *args)
+
+    def run_snapshot(self, filename, seq, save_data, writer):
+        with self.lock:
+            if self.latest.get(filename, seq) > seq:
+                return
+        # The snapshot retires the journal, so let go of it first
+        self.run_job(self.journal.close, filename)
+        self.run_job(writer, filename, save_data)
+
+    def run_job(self, func, *args):
+        try:
+            with profiler.timed('persistence worker'):
+                func(*args)
+        except Exception as e:
+            print(f"Background save failed: {str(e)}")
+            profiler.error('persistence worker', str(e))
+
+    def flush(self):
+        # Block until everything submitted so far is on disk
+        self.executor.submit(lambda: None).result()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        for filename in list(self.journal.files):
+            self.journal.close(filename)
+
+
+class LazySession:
+    """A saved session opened header first.
+
+    The rack variables and checkbox states are parsed straight away; notes,
+    generated documents and the step copy are parsed the first time one of
+    their keys is asked for. Journal entries are replayed onto whichever part
+    they belong to. Safe to use from the persistence worker and the UI at once."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.records = read_journal(filename)
+        try:
+            header, self.offset = read_session_header(filename)
+        except FileNotFoundError:
+            if not self.records:
+                raise
+            # Crashed before the first snapshot, the journal is all there is
+            header, self.offset = {}, None
+        self.pending = list(header.pop(SECTIONS_HEADER_KEY, None) or [])
+        self.texts = None
+        self.data = header
+        self.replay(lambda key: SECTION_KEYS.get(key) not in self.pending)
+
+    def replay(self, wanted):
+        for record in self.records:
+            apply_record(self.data, {key: value for key, value in record.items() if wanted(key)})
+
+    def header(self):
+        return self.data
+
+    def is_loaded(self, name):
+        return name not in self.pending
+
+    def load_section(self, name):
+        with self.lock:
+            if name not in self.pending:
+                return
+            if self.texts is None:
+                # Only splits the rest of the file, nothing is parsed here
+                self.texts = read_session_sections(self.filename, self.offset, self.pending)
+            # A section that doesn't parse stays pending, its text kept
+            self.data.update(parse_session_section(self.filename, self.texts[name]))
+            del self.texts[name]
+            self.pending.remove(name)
+            self.replay(lambda key: SECTION_KEYS.get(key) == name)
+
+    def get(self, key, default=None):
+        name = SECTION_KEYS.get(key)
+        if name is not None:
+            self.load_section(name)
+        return self.data.get(key, default)
+
+    def load_all(self):
+        for name in list(self.pending):
+            self.load_section(name)
+        return self.data
+
+
+def open_session(filename):
+    return LazySession(filename)
+
+
+def load_session(filename):
+    # Snapshot plus any journal entries written after it
+    return LazySession(filename).load_all()
+
+
+class AutoSaveEngine:
+    """Dirty-tracking autosave: skips clean sessions, coalesces bursts of edits
+    and appends only changed sections to a journal that is compacted later."""
+
+    def __init__(self, filename, worker=None, quiet_period=0.75, max_delay=5.0, compact_every=200, compact_bytes=1 << 20):
+        self.filename = filename
+        self.worker = worker
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self.compact_every = compact_every
+        self.compact_bytes = compact_bytes
+        self.dirty = {}  # section -> set of changed keys, or None for the whole section
+        self.first_change = None
+        self.last_change = None
+        self.journal_records = 0
+        self.journal_size = 0
+        self.has_snapshot = False
+
+    def mark_dirty(self, section, key=None):
+        now = time.monotonic()
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+
+        if section in MERGED_SECTIONS and key is not None:
+            if section not in self.dirty:
+                self.dirty[section] = set()
+            if self.dirty[section] is not None:
+                self.dirty[section].add(key)
+        else:
+            self.dirty[section] = None
+
+    def log_edit(self, record, **audit):
+        """Journals a single edit right away instead of waiting for the next flush.
+
+        Ticks and notes go through here; the record is a normal journal record
+        plus audit fields (rack, sys), so replaying it is the same as replaying a flush."""
+        self.append_record({**audit, **record})
+        if not self.has_snapshot or self.needs_compaction():
+            # Journal needs a snapshot under it, or has grown enough to fold into one
+            self.mark_dirty('all')
+
+    def sync(self):
+        # Batched fsync of everything journaled since the last call
+        if self.worker is not None:
+            self.worker.submit_sync()
+
+    def close(self, save_data):
+        # Exit snapshot, marked so the next start doesn't take it for a crash
+        self.write_snapshot({**save_data, CLEAN_EXIT_KEY: True})
+        self.dirty = {}
+        self.first_change = None
+        self.last_change = None
+
+    def mark_all_dirty(self):
+        # Next flush rewrites the full snapshot, e.g. after loading a session
+        self.has_snapshot = False
+        self.mark_dirty('all')
+
+    def is_dirty(self):
+        return bool(self.dirty)
+
+    def should_flush(self):
+        if not self.dirty:
+            return False
+        now = time.monotonic()
+        # Wait for a pause in typing/clicking, but never hold edits back too long
+        return now - self.last_change >= self.quiet_period or now - self.first_change >= self.max_delay
+
+    def flush(self, save_data, force=False):
+        if not (force and self.dirty) and not self.should_flush():
+            return False
+
+        if not self.has_snapshot or 'all' in self.dirty or self.needs_compaction():
+            self.write_snapshot(save_data)
+        else:
+            self.append_record(self.build_record(save_data))
+
+        self.dirty = {}
+        self.first_change = None
+        self.last_change = None
+        return True
+
+    def build_record(self, save_data):
+        record = {}
+        for section, keys in self.dirty.items():
+            if section in MERGED_SECTIONS:
+                values = save_data.get(section, {})
+                if keys is None:
+                    record[section] = dict(values)
+                else:
+                    record[section] = {key: values[key] for key in keys if key in values}
+            elif section in save_data:
+                record[section] = save_data[section]
+        return record
+
+    def needs_compaction(self):
+        return self.journal_records >= self.compact_every or self.journal_size >= self.compact_bytes
+
+    def append_record(self, record):
+        record = {'at': round(time.time(), 3), **record}
+        if self.worker is not None:
+            self.worker.submit_append(self.filename, record)
+        else:
+            append_journal_record(self.filename, record)
+        self.journal_records += 1
+        # Rough size estimate, good enough to decide when to compact
+        self.journal_size += sum(len(str(value)) for value in record.values())
+
+    def write_snapshot(self, save_data):
+        if self.worker is not None:
+            self.worker.submit_snapshot(self.filename, save_data)
+        else:
+            write_snapshot_file(self.filename, save_data)
+        self.journal_records = 0
+        self.journal_size = 0
+        self.has_snapshot = True
@@ -0,0 +1,144 @@
+import os
+import json
+import yaml
+
+# Use libyaml's C loader when PyYAML was built with it, the pure Python one otherwise
+try:
+    from yaml import CSafeLoader as SafeLoader
+    LIBYAML = True
+except ImportError:
+    from yaml import SafeLoader
+    LIBYAML = False
+
+# Dumping always goes through the pure Python Dumper. CDumper writes long keys
+# and wraps long quoted strings differently, and the YAML written here (sessions,
+# info/bmc documents) is read and diffed by people, so it mustn't depend on
+# whether libyaml happens to be installed. JSON is the fast autosave format.
+Dumper = yaml.Dumper
+
+
+def load_yaml(stream):
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump_yaml(data, **kwargs):
+    return yaml.dump(data, Dumper=Dumper, **kwargs)
+
+
+def load_json(stream):
+    return json.loads(stream if isinstance(stream, str) else stream.read())
+
+
+def dump_json(data):
+    return json.dumps(data, separators=(',', ':'))
+
+
+# Session formats by file extension. YAML stays the default for the
+# {sys}-{rack}.yaml files people open by hand, JSON is there for autosave.
+SESSION_FORMATS = {
+    '.yaml': (dump_yaml, load_yaml),
+    '.yml': (dump_yaml, load_yaml),
+    '.json': (dump_json, load_json),
+}
+
+# A session file is a small header (rack variables, checkbox states) followed
+# by the bulky sections, one YAML document or JSON line each, so opening a
+# session only has to parse the header. The header lists the sections that follow.
+SESSION_SECTIONS = {
+    'notes': ('user_notes',),
+    'outputs': ('u2_info_yaml', 'u2_bmc_yaml', 'u1_info_yaml', 'u1_bmc_yaml', 'u1_hostlist'),
+    'steps': ('steps',),
+}
+SECTION_KEYS = {key: name for name, keys in SESSION_SECTIONS.items() for key in keys}
+SECTIONS_HEADER_KEY = 'session_sections'
+
+
+def session_format(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    return SESSION_FORMATS.get(ext, SESSION_FORMATS['.yaml'])
+
+
+def is_json_session(filename):
+    return session_format(filename)[0] is dump_json
+
+
+def split_sections(data):
+    header = {key: value for key, value in data.items() if key not in SECTION_KEYS}
+    sections = {}
+    for key, value in data.items():
+        if key in SECTION_KEYS:
+            sections.setdefault(SECTION_KEYS[key], {})[key] = value
+    header[SECTIONS_HEADER_KEY] = list(sections)
+    return [header] + list(sections.values())
+
+
+def dump_session(data, filename):
+    documents = split_sections(data)
+    if is_json_session(filename):
+        return "".join(dump_json(document) + "\n" for document in documents)
+    # Every document starts with a "---" line; anything else in the file is
+    # indented under a top-level key, so those lines are the section boundaries
+    return yaml.dump_all(documents, Dumper=Dumper, explicit_start=True)
+
+
+def is_section_start(line, json_lines):
+    return json_lines or line.rstrip(b"\r\n") == b"---" or line.startswith(b"--- ")
+
+
+def read_session_header(filename):
+    """Parses just the header of a session file.
+
+    Returns (header, offset) where offset is where the sections start, or
+    (data, None) for a single-document session from before the split."""
+    json_lines = is_json_session(filename)
+    lines = []
+    offset = 0
+    with open(filename, 'rb') as file:
+        line = file.readline()
+        if not json_lines and is_section_start(line, False):
+            offset += len(line)
+            line = file.readline()
+        while line:
+            lines.append(line)
+            offset += len(line)
+            if json_lines:
+                break
+            line = file.readline()
+            if is_section_start(line, json_lines):
+                break
+
+    text = b"".join(lines).decode('utf-8')
+    header = (load_json(text) if json_lines else load_yaml(text)) or {}
+    if SECTIONS_HEADER_KEY not in header:
+        return header, None
+    return header, offset
+
+
+def read_session_sections(filename, offset, names):
+    """Returns the unparsed text of each section after the header, by name."""
+    json_lines = is_json_session(filename)
+    documents = []
+    with open(filename, 'rb') as file:
+        file.seek(offset)
+        for line in file:
+            if not documents or (is_section_start(line, json_lines) and documents[-1]):
+                documents.append([])
+            documents[-1].append(line)
+    return {name: b"".join(lines).decode('utf-8') for name, lines in zip(names, documents)}
+
+
+def parse_session_section(filename, text):
+    if is_json_session(filename):
+        return load_json(text) or {}
+    return load_yaml(text) or {}
+
+
+def load_session_file(filename):
+    """Whole session as one dict, whichever layout the file has."""
+    header, offset = read_session_header(filename)
+    if offset is None:
+        return header
+    data = {key: value for key, value in header.items() if key != SECTIONS_HEADER_KEY}
+    for text in read_session_sections(filename, offset, header[SECTIONS_HEADER_KEY]).values():
+        data.update(parse_session_section(filename, text))
+    return data
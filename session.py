@@ -0,0 +1,108 @@
+"""Per-rack state for the checklist window.
+
+MyApp hosts any number of RackSessions and shows one at a time. Its rack
+attributes (sys_var, rack_var, u2_info_yaml_str...) are SessionAttributes that
+read and write the active session, so switching racks is swapping one
+reference; no widgets are rebuilt.
+"""
+import yaml
+from instrumentation import profiler
+
+# Rack variables saved under the same key
+VARIABLES = ('sys_var', 'rack_var', 'mtm_var', 'plain_rack_var', 'mtor_var', 'tor_var', 'pdu_var', 'bmc_var', 'server_var')
+
+
+class RackSession:
+    """One rack's variables, checklist progress, notes and generated documents."""
+
+    __slots__ = VARIABLES + (
+        'plain_sr_var', 'sr_var',
+        'checkbox_states', 'done', 'bits', 'user_notes',
+        'u2_info_yaml_str', 'u2_bmc_yaml_str', 'u1_info_yaml_str', 'u1_bmc_yaml_str', 'hostlist1u',
+        'loaded_session', 'deferred_sections', 'failed_sections', 'save_engine',
+    )
+
+    def __init__(self, save_engine):
+        for name in VARIABLES:
+            setattr(self, name, "")
+        self.plain_sr_var = ""
+        self.sr_var = ""
+        # Filled in by ChecklistModel.load_states, shared with the model while this rack is shown
+        self.checkbox_states = {}
+        self.done = {}
+        self.bits = {}
+        self.user_notes = {}
+        self.u2_info_yaml_str = ""
+        self.u2_bmc_yaml_str = ""
+        self.u1_info_yaml_str = ""
+        self.u1_bmc_yaml_str = ""
+        self.hostlist1u = ""
+        self.loaded_session = None  # LazySession still holding unparsed parts
+        self.deferred_sections = set()
+        self.failed_sections = set()  # Deferred sections that didn't parse, the session can't be saved over
+        self.save_engine = save_engine
+
+    def label(self):
+        return self.rack_var or "(new rack)"
+
+    def load_deferred(self, name):
+        """Takes a section of the opened session file on board, returns True if it did."""
+        if name not in self.deferred_sections or name in self.failed_sections:
+            return False
+        saved = self.loaded_session
+        try:
+            if name == 'notes':
+                user_notes = saved.get('user_notes') or {}
+            elif name == 'outputs':
+                outputs = [saved.get(key, "") for key in ('u2_info_yaml', 'u2_bmc_yaml', 'u1_info_yaml', 'u1_bmc_yaml', 'u1_hostlist')]
+        except (yaml.YAMLError, ValueError, OSError) as e:
+            # Stays pending; saving now would write the section out empty
+            self.failed_sections.add(name)
+            print(f"Error parsing the {name} of {saved.filename}: {str(e)}")
+            profiler.error('load_session_from_file', str(e))
+            return False
+        if name == 'notes':
+            self.user_notes = user_notes
+        elif name == 'outputs':
+            self.u2_info_yaml_str, self.u2_bmc_yaml_str, self.u1_info_yaml_str, self.u1_bmc_yaml_str, self.hostlist1u = outputs
+        self.deferred_sections.discard(name)
+        if not self.deferred_sections:
+            self.loaded_session = None
+        return True
+
+    def can_save(self):
+        return not self.failed_sections
+
+    def save_data(self, checklist_version):
+        # A save needs the whole session, including parts nobody has opened yet
+        for name in list(self.deferred_sections):
+            self.load_deferred(name)
+        if self.failed_sections:
+            raise ValueError(f"{', '.join(sorted(self.failed_sections))} of {self.loaded_session.filename} didn't parse, not saving over it")
+        save_data = {name: getattr(self, name) for name in VARIABLES}
+        save_data.update({
+            'checklist_version': checklist_version,
+            'user_notes': self.user_notes,
+            'progress': dict(self.bits),
+            'u2_info_yaml': self.u2_info_yaml_str,
+            'u2_bmc_yaml': self.u2_bmc_yaml_str,
+            'u1_info_yaml': self.u1_info_yaml_str,
+            'u1_bmc_yaml': self.u1_bmc_yaml_str,
+            'u1_hostlist': self.hostlist1u,
+        })
+        return save_data
+
+
+class SessionAttribute:
+    """Window attribute stored on the window's active RackSession."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, window, owner=None):
+        if window is None:
+            return self
+        return getattr(window.session, self.name)
+
+    def __set__(self, window, value):
+        setattr(window.session, self.name, value)
@@ -0,0 +1,200 @@
+"""SQLite index over saved {sys}-{rack} session files.
+
+Holds the sys ticket, rack, MTM, completion and modified time of every
+session in a directory, so "open recent" and "find rack" are a query instead
+of a YAML parse per file. Saves update their row as they happen; rebuild()
+catches up with files copied in or edited elsewhere, only re-parsing the ones
+whose mtime or size changed. YAML/JSON files that turned out not to be
+sessions (steps.yaml, benchmark results) or failed to parse are remembered in
+other_files, so they aren't parsed again until they change.
+"""
+import os
+import sys
+import json
+import sqlite3
+import threading
+from checklist import CatalogStore
+from persistence import open_session
+from serialization import SESSION_FORMATS
+
+INDEX_FILENAME = ".sessions.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path TEXT PRIMARY KEY,
+    sys TEXT NOT NULL,
+    rack TEXT NOT NULL,
+    mtm TEXT NOT NULL,
+    completion REAL NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_rack ON sessions (rack);
+CREATE INDEX IF NOT EXISTS sessions_sys ON sessions (sys);
+CREATE INDEX IF NOT EXISTS sessions_mtime ON sessions (mtime);
+CREATE TABLE IF NOT EXISTS other_files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+COLUMNS = ('path', 'sys', 'rack', 'mtm', 'completion', 'mtime', 'size')
+
+
+def completion(save_data, store):
+    progress = save_data.get('progress')
+    if progress is None:
+        # Saved before progress bitsets
+        chk_states = [checked for states in (save_data.get('checkbox_states') or {}).values() for checked in states]
+        return sum(1 for checked in chk_states if checked) / len(chk_states) if chk_states else 0.0
+    steps = store.get(save_data.get('checklist_version')) or {}
+    total = sum(len(sub_steps) for sub_steps in steps.values())
+    done = sum(bin(int(progress.get(main_step) or 0)).count('1') for main_step in steps)
+    return done / total if total else 0.0
+
+
+def is_session(save_data):
+    return isinstance(save_data, dict) and ('progress' in save_data or 'checkbox_states' in save_data)
+
+
+def is_session_file(name):
+    # The autosave scratch file isn't a session anyone wants to reopen
+    return os.path.splitext(name)[1].lower() in SESSION_FORMATS and not name.startswith(("delete-me-autosave", "."))
+
+
+class SessionIndex:
+    def __init__(self, path=INDEX_FILENAME, store=None):
+        self.path = path
+        self.store = store or CatalogStore(os.path.join(os.path.dirname(os.path.abspath(path)), "step-catalog"))
+        # Saves record themselves from the persistence worker thread
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def row_for(self, path, save_data, stat=None):
+        stat = stat or os.stat(path)
+        mtm = save_data.get('mtm_var', "")
+        return (os.path.abspath(path), str(save_data.get('sys_var', "")), str(save_data.get('rack_var', "")),
+                mtm if isinstance(mtm, str) else "", completion(save_data, self.store),
+                stat.st_mtime, stat.st_size)
+
+    def record(self, path, save_data):
+        """Updates the entry for a session that was just written."""
+        row = self.row_for(path, save_data)
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            self.db.execute("DELETE FROM other_files WHERE path = ?", (row[0],))
+
+    def remove(self, path):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM sessions WHERE path = ?", (os.path.abspath(path),))
+
+    def rebuild(self, directory="."):
+        """Brings the index in line with the session files in directory.
+
+        Returns (parsed, removed, skipped, failed) counts; skipped and failed
+        include files left alone because they haven't changed since."""
+        directory = os.path.abspath(directory)
+        pattern = os.path.join(directory, '%')
+        with self.lock:
+            known = {path: (mtime, size) for path, mtime, size in
+                     self.db.execute("SELECT path, mtime, size FROM sessions WHERE path LIKE ?", (pattern,))}
+            others = {path: (kind, mtime, size) for path, kind, mtime, size in
+                      self.db.execute("SELECT path, kind, mtime, size FROM other_files WHERE path LIKE ?", (pattern,))}
+
+        rows = []
+        other_rows = []
+        seen = set()
+        counts = {'skipped': 0, 'failed': 0}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not is_session_file(entry.name):
+                    continue
+                path = entry.path
+                stat = entry.stat()
+                seen.add(path)
+                if known.get(path) == (stat.st_mtime, stat.st_size):
+                    continue
+                kind, mtime, size = others.get(path, (None, None, None))
+                if (mtime, size) == (stat.st_mtime, stat.st_size):
+                    counts[kind] += 1
+                    continue
+                try:
+                    save_data = self.read_header(path)
+                    kind = None if is_session(save_data) else 'skipped'
+                    if kind is None:
+                        rows.append(self.row_for(path, save_data, stat))
+                except Exception as e:
+                    kind = 'failed'
+                    print(f"Skipping {path} in session index: {str(e)}")
+                if kind is not None:
+                    counts[kind] += 1
+                    other_rows.append((path, kind, stat.st_mtime, stat.st_size))
+
+        gone = [(path,) for path in set(known) | set(others) if path not in seen and os.path.dirname(path) == directory]
+        # A file is in one table or the other
+        not_sessions = [(row[0],) for row in other_rows]
+        not_others = [(row[0],) for row in rows]
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.executemany("INSERT OR REPLACE INTO other_files VALUES (?, ?, ?, ?)", other_rows)
+            self.db.executemany("DELETE FROM sessions WHERE path = ?", gone + not_sessions)
+            self.db.executemany("DELETE FROM other_files WHERE path = ?", gone + not_others)
+        return len(rows), len(gone), counts['skipped'], counts['failed']
+
+    def read_header(self, path):
+        # Everything indexed is in the session header
+        try:
+            return open_session(path).header()
+        except ValueError:
+            if not path.lower().endswith(".json"):
+                raise
+            # JSON that isn't one document per line, e.g. benchmark results
+            with open(path, 'r') as file:
+                return json.load(file)
+
+    def search(self, text="", limit=50):
+        """Sessions whose rack, sys ticket or MTM contains text, newest first."""
+        query = "SELECT * FROM sessions"
+        params = []
+        if text:
+            query += " WHERE rack LIKE ? ESCAPE '\\' OR sys LIKE ? ESCAPE '\\' OR mtm LIKE ? ESCAPE '\\'"
+            pattern = "%" + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + "%"
+            params = [pattern] * 3
+        query += " ORDER BY mtime DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            return [dict(zip(COLUMNS, row)) for row in self.db.execute(query, params)]
+
+    def recent(self, limit=20):
+        return self.search("", limit)
+
+
+def main(argv=None):
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(prog="main.py sessions", description="Index and search saved sessions.")
+    parser.add_argument('text', nargs='?', default="", help="part of a rack name, sys ticket or MTM; newest sessions if left out")
+    parser.add_argument('--dir', default=".", help="directory holding the session files")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    index = SessionIndex(os.path.join(args.dir, INDEX_FILENAME))
+    start = time.perf_counter()
+    parsed, removed, skipped, failed = index.rebuild(args.dir)
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    rows = index.search(args.text, args.limit)
+    searched = time.perf_counter() - start
+    for row in rows:
+        print(f"{row['rack']:<24}{row['sys']:<16}{row['mtm']:<20}{row['completion'] * 100:>5.0f}%  {row['path']}")
+    print(f"{parsed} parsed, {removed} removed, {skipped} not sessions, {failed} failed in {indexed * 1000:.1f} ms; "
+          f"{len(rows)} matches in {searched * 1000:.1f} ms", file=sys.stderr)
+    index.close()
+    return 1 if failed else 0
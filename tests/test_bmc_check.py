@@ -0,0 +1,71 @@
+import socket
+import asyncio
+import unittest
+from bmc_check import Prober, StandInBmc, Target, targets_from_info
+
+
+def closed_port():
+    # A port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def probe_stand_in(passwords, targets, latency=0.0, timeout=2.0):
+    stand_in = await StandInBmc(passwords, latency=latency).start()
+    try:
+        for target in targets:
+            target.port = target.port or stand_in.port
+        prober = Prober(timeout=timeout, tls=False, concurrency=4)
+        return {result.name: result for result in await prober.run(targets)}, stand_in
+    finally:
+        await stand_in.stop()
+
+
+class ProberTest(unittest.TestCase):
+    def test_credentials(self):
+        passwords = {"rk07-s02-bmc": "Secret01", "rk07-s04-bmc": "Secret02"}
+        targets = [Target("rk07-s02-bmc", "Secret01", "127.0.0.1"),
+                   Target("rk07-s04-bmc", "wrong", "127.0.0.1"),
+                   Target("rk07-s06-bmc", "Secret03", "127.0.0.1"),
+                   Target("rk07-s08-bmc", "Secret04", "127.0.0.1", closed_port())]
+        results, stand_in = asyncio.run(probe_stand_in(passwords, targets))
+        port = stand_in.port
+
+        good = results["rk07-s02-bmc"]
+        self.assertTrue(good.ok)
+        self.assertEqual(good.details, [f"tcp: port {port} open", "redfish: credentials accepted"])
+
+        wrong = results["rk07-s04-bmc"]
+        self.assertFalse(wrong.ok)
+        self.assertEqual(wrong.details, [f"tcp: port {port} open", "redfish: credentials rejected (401)"])
+
+        unknown = results["rk07-s06-bmc"]
+        self.assertFalse(unknown.ok)
+        self.assertEqual(unknown.details[-1], "redfish: unexpected HTTP 404")
+
+        # Later checks are skipped once one fails
+        refused = results["rk07-s08-bmc"]
+        self.assertFalse(refused.ok)
+        self.assertEqual(len(refused.details), 1)
+        self.assertTrue(refused.details[0].startswith("tcp: "))
+        # Every host's checks share one connection
+        self.assertEqual(stand_in.connections, 3)
+
+    def test_timeout(self):
+        targets = [Target("rk07-s02-bmc", "Secret01", "127.0.0.1")]
+        results, _ = asyncio.run(probe_stand_in({"rk07-s02-bmc": "Secret01"}, targets, latency=1.0, timeout=0.1))
+        result = results["rk07-s02-bmc"]
+        self.assertFalse(result.ok)
+        self.assertEqual(result.details[-1], "redfish: timed out after 0.1s")
+        self.assertLess(result.seconds, 1.0)
+
+    def test_targets_from_info(self):
+        info = "a01-sr01-rk07-s02-bmc:\n  mac: AA:BB:CC:DD:EE:FF\n  password: Secret01\n  mtm: SR650\n"
+        targets = targets_from_info(info)
+        self.assertEqual([(target.name, target.password, target.address) for target in targets],
+                         [("a01-sr01-rk07-s02-bmc", "Secret01", "a01-sr01-rk07-s02-bmc")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import random
+import unittest
+import yaml
+from emitter import write_bmc, write_info
+from generator import bmc_data, info_data
+
+# Golden reference is plain yaml.dump, the pure Python emitter the generator
+# tabs used before emitter.py
+AWKWARD = [
+    "", "true", "yes", "No", "null", "~", "12345", "0x1F", "1e5", "1_000", "0o17", "11:22:33", "12:30",
+    "2024-01-01", ".5", ".inf", "-abc", "abc:", "a: b", "#hash", "pass word", " lead", "trail ", "it's",
+    'say "hi"', "pässwörd", "tab\there", "x" * 150, "AA:BB:CC:DD:EE:FF", "aa-bb", "a/b.c+d", "@home", "%pct",
+    "*star", "&amp", "!bang", "[list]", "{map}", "|pipe", ">gt", "`tick`", "?q", ",comma", "---", "...",
+    "=", "<<", "line\nbreak", "INVALID",
+]
+
+
+def reference(hosts_info, macs, pws, mtm, hosts_bmc, sort_info, sort_bmc):
+    data = info_data(hosts_info, macs, pws, mtm)
+    if sort_info:
+        data = {k: data[k] for k in sorted(data, reverse=True)}
+    return yaml.dump(data, sort_keys=False), yaml.dump(bmc_data(hosts_bmc, pws), sort_keys=sort_bmc)
+
+
+def emitted(hosts_info, macs, pws, mtm, hosts_bmc, sort_info, sort_bmc):
+    info = io.StringIO()
+    bmc = io.StringIO()
+    write_info(info, [(h, m, p, mtm) for h, m, p in zip(hosts_info, macs, pws)], reverse_sort=sort_info)
+    write_bmc(bmc, zip(hosts_bmc, pws), sort=sort_bmc)
+    return info.getvalue(), bmc.getvalue()
+
+
+def golden_cases():
+    rng = random.Random(1)
+    rack = "a01-sr01-rk07"
+    hosts = [f"{rack}-s{i:02d}" for i in range(2, 52, 2)]
+    yield "typical 2U", hosts[::-1], [f"AA:BB:CC:00:00:{i:02X}" for i in range(25)], [f"pw{i:06d}" for i in range(25)], "SR650", hosts[::-1], True, True
+    yield "typical 1U", hosts, [f"AA:BB:CC:00:00:{i:02X}" for i in range(25)], [f"pw{i:06d}" for i in range(25)], "", hosts[::-1], False, False
+    yield "empty", [], [], [], "SR650", [], True, True
+    yield "duplicate hosts", hosts[:3] + hosts[:2], ["m1", "m2", "m3", "m4", "m5"], ["p1", "p2", "p3", "p4", "p5"], "SR650", hosts[:2] * 2, False, False
+    for value in AWKWARD:
+        yield f"awkward {value!r}", [f"{rack}-{value}"], [value], [value], value, [value], False, False
+    for n in range(20):
+        values = rng.sample(AWKWARD, 10)
+        yield f"mixed {n}", [f"{rack}-s{i:02d}" for i in range(10)], values, values[::-1], rng.choice(AWKWARD), values, n % 2 == 0, n % 3 == 0
+
+
+class GoldenOutputTest(unittest.TestCase):
+    def test_byte_identical_to_yaml_dump(self):
+        for name, *args in golden_cases():
+            with self.subTest(name):
+                self.assertEqual(emitted(*args), reference(*args))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import fleet
+
+generate_job = fleet.generate_job
+
+
+def job_or_die(entry, base_dir, out_dir):
+    # Stands in for a worker getting OOM-killed mid-rack
+    if entry['rack'] == "a01-sr01-rk66":
+        os._exit(1)
+    return generate_job(entry, base_dir, out_dir)
+
+
+def entries(count):
+    return [{'rack': f"a01-sr01-rk{i:02d}", 'mtm': "SR650", 'macs': ["00:1b:21:00:00:%02X" % i], 'pws': [f"Secret{i:02d}"]}
+            for i in range(count)]
+
+
+class FleetTest(unittest.TestCase):
+    def test_generates_every_rack(self):
+        with tempfile.TemporaryDirectory() as directory:
+            report = fleet.generate_fleet(entries(10), out_dir=directory, workers=2)
+            self.assertEqual((report.done, report.failed), (10, []))
+            self.assertTrue(os.path.exists(os.path.join(directory, "a01-sr01-rk09-info.yaml")))
+
+    def test_dead_worker_fails_its_racks_and_the_run_goes_on(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch('fleet.generate_job', job_or_die):
+            report = fleet.generate_fleet(entries(80), out_dir=directory, workers=2)
+        failed = dict(report.failed)
+        self.assertIn("a01-sr01-rk66", failed)
+        self.assertTrue(failed["a01-sr01-rk66"].startswith("worker process died"))
+        self.assertEqual(report.done + len(report.failed), 80)
+        # Racks after the crash were still generated on a fresh pool
+        self.assertGreater(report.done, 66 - 2 * 4)
+        self.assertIn("failed", report.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
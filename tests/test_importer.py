@@ -0,0 +1,30 @@
+import unittest
+from generator import format_mac_issues, generate_keyed
+from importer import pair_by_key, read_host_map
+
+
+class KeyedImportTest(unittest.TestCase):
+    def test_mac_issues_report_mac_file_lines(self):
+        mac_lines = ["# host mac", "s02 00:1b:21:00:00:01", "", "s04 not-a-mac", "s06 00-1B-21-00-00-01", "s08 00:1b:21:00:00:09"]
+        pw_lines = ["s08 Secret08", "s06 Secret06", "s04 Secret04", "s02 Secret02", "s10 Secret10"]
+        unmatched = []
+        outputs = generate_keyed("a01-sr01-rk07", pair_by_key(mac_lines, pw_lines, unmatched), "SR650")
+
+        self.assertEqual(format_mac_issues(outputs['mac_issues']), [
+            "MAC line 4 ('not-a-mac'): not 12 hex digits",
+            "MAC line 5 ('00-1B-21-00-00-01'): duplicate of row 2",
+        ])
+        self.assertEqual(unmatched, ["no MAC for s10"])
+        self.assertIn("a01-sr01-rk07-s08-bmc:\n  mac: 00:1B:21:00:00:09\n  password: Secret08\n", outputs['info'])
+
+    def test_serial_keys_go_through_the_host_map(self):
+        mac_lines = ["J30012AB 00:1b:21:00:00:01", "J30012AC 00:1b:21:00:00:02", "s06 00:1b:21:00:00:03"]
+        pw_lines = ["J30012AB Secret02", "J30012AC Secret04", "s06 Secret06"]
+        host_map = read_host_map(["# serial host", "J30012AB s02", "J30012AC a01-sr01-rk07-s04"])
+        outputs = generate_keyed("a01-sr01-rk07", pair_by_key(mac_lines, pw_lines), "SR650", host_map=host_map)
+        self.assertEqual(outputs['hosts'].split("\n"), ["a01-sr01-rk07-s02", "a01-sr01-rk07-s04", "a01-sr01-rk07-s06"])
+        self.assertNotIn("J30012", outputs['info'] + outputs['bmc'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import json
+import tempfile
+import unittest
+from persistence import (UMASK, AutoSaveEngine, atomic_write, JournalWriter, PersistenceWorker, history_path, journal_path, load_session,
+                         needs_recovery, open_session, read_journal, retire_journal, rotate_history, write_snapshot_file)
+
+
+def session_data():
+    return {'sys_var': "SYS1", 'rack_var': "a01-sr01-rk07", 'progress': {'Cable': 0},
+            'user_notes': {'Cable': "label both ends"}, 'u2_info_yaml': ""}
+
+
+class AtomicWriteTest(unittest.TestCase):
+    def test_permissions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            new = os.path.join(directory, "SYS1-a01-sr01-rk07.yaml")
+            atomic_write(new, "a: 1\n")
+            self.assertEqual(os.stat(new).st_mode & 0o777, 0o666 & ~UMASK)
+            # Rewriting keeps the file's own mode
+            os.chmod(new, 0o640)
+            atomic_write(new, "a: 2\n")
+            self.assertEqual(os.stat(new).st_mode & 0o777, 0o640)
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "autosave.yaml")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_log_edit_is_replayed_onto_the_snapshot(self):
+        engine = AutoSaveEngine(self.filename)
+        engine.write_snapshot(session_data())
+        engine.log_edit({'progress': {'Cable': 1}, 'tick': ['Cable', 0, True]}, rack="a01-sr01-rk07", sys="SYS1")
+        engine.log_edit({'user_notes': {'Power': "two PDUs"}}, rack="a01-sr01-rk07", sys="SYS1")
+
+        records = read_journal(self.filename)
+        self.assertEqual([record['rack'] for record in records], ["a01-sr01-rk07"] * 2)
+        self.assertTrue(all('at' in record for record in records))
+
+        data = load_session(self.filename)
+        self.assertEqual(data['progress'], {'Cable': 1})
+        self.assertEqual(data['user_notes'], {'Cable': "label both ends", 'Power': "two PDUs"})
+        # Audit fields aren't session data
+        self.assertNotIn('tick', data)
+        self.assertNotIn('at', data)
+
+    def test_lazy_session_replays_into_deferred_sections(self):
+        write_snapshot_file(self.filename, session_data())
+        AutoSaveEngine(self.filename).log_edit({'user_notes': {'Cable': "edited"}, 'progress': {'Cable': 3}})
+        saved = open_session(self.filename)
+        self.assertEqual(saved.header()['progress'], {'Cable': 3})
+        self.assertFalse(saved.is_loaded('notes'))
+        self.assertEqual(saved.get('user_notes'), {'Cable': "edited"})
+
+    def test_snapshot_retires_the_journal_to_history(self):
+        engine = AutoSaveEngine(self.filename)
+        engine.write_snapshot(session_data())
+        engine.log_edit({'progress': {'Cable': 1}, 'tick': ['Cable', 0, True]})
+        engine.write_snapshot(session_data())
+
+        self.assertFalse(os.path.exists(journal_path(self.filename)))
+        with open(history_path(self.filename), 'r') as file:
+            history = [json.loads(line) for line in file]
+        # Records without a rack get the snapshot's
+        self.assertEqual([(record['rack'], record['sys'], record['tick']) for record in history],
+                         [("a01-sr01-rk07", "SYS1", ['Cable', 0, True])])
+        retire_journal(self.filename)  # Nothing to retire
+
+    def test_history_rotation(self):
+        path = history_path(self.filename)
+        for generation in range(5):
+            with open(path, 'a') as file:
+                file.write(f"{generation}\n" * 100)
+            rotate_history(self.filename, max_bytes=100, keep=3)
+        with open(path + ".1") as newest, open(path + ".3") as oldest:
+            self.assertEqual((newest.readline(), oldest.readline()), ("4\n", "2\n"))
+        self.assertFalse(os.path.exists(path + ".4"))
+
+    def test_torn_line_is_skipped_and_appends_start_on_a_new_line(self):
+        write_snapshot_file(self.filename, session_data())
+        with open(journal_path(self.filename), 'w') as file:
+            file.write(json.dumps({'progress': {'Cable': 1}}) + "\n" + '{"progress": {"Cab')
+        writer = JournalWriter()
+        writer.append(self.filename, {'progress': {'Cable': 2}})
+        writer.sync()
+        writer.close(self.filename)
+
+        self.assertEqual(read_journal(self.filename), [{'progress': {'Cable': 1}}, {'progress': {'Cable': 2}}])
+        self.assertEqual(load_session(self.filename)['progress'], {'Cable': 2})
+
+    def test_worker_journal_and_snapshot_order(self):
+        worker = PersistenceWorker()
+        engine = AutoSaveEngine(self.filename, worker=worker)
+        engine.write_snapshot(session_data())
+        engine.log_edit({'progress': {'Cable': 1}})
+        engine.sync()
+        worker.flush()
+        self.assertEqual(load_session(self.filename)['progress'], {'Cable': 1})
+        engine.close(session_data())
+        worker.shutdown()
+        self.assertFalse(os.path.exists(journal_path(self.filename)))
+        self.assertFalse(needs_recovery(self.filename))
+
+    def test_needs_recovery(self):
+        self.assertFalse(needs_recovery(self.filename))  # No autosave at all
+        engine = AutoSaveEngine(self.filename)
+        # Crashed right after a snapshot, nothing journaled yet
+        engine.write_snapshot(session_data())
+        self.assertTrue(needs_recovery(self.filename))
+        engine.close(session_data())
+        self.assertFalse(needs_recovery(self.filename))
+        # Edits journaled after the exit snapshot was written
+        engine.log_edit({'progress': {'Cable': 1}})
+        self.assertTrue(needs_recovery(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+import yaml
+from serialization import dump_session, dump_yaml, load_session_file, load_yaml
+
+LONG_KEY = "k" * 200
+LONG_QUOTED = "line one\twith a tab " + "and more words " * 20
+
+
+class DumpYamlTest(unittest.TestCase):
+    def test_matches_pure_python_dump(self):
+        # The cases where CDumper's output differs
+        for data in ({LONG_KEY: "value"}, {'note': LONG_QUOTED}, {'a': [1, 2], 'b': {'c': None}}):
+            self.assertEqual(dump_yaml(data), yaml.dump(data))
+            self.assertEqual(dump_yaml(data, sort_keys=False), yaml.dump(data, sort_keys=False))
+
+    def test_session_round_trip(self):
+        data = {'sys_var': "SYS1", 'rack_var': "a01-sr01-rk07", 'user_notes': {LONG_KEY: LONG_QUOTED}, 'u2_info_yaml': "x: 1\n"}
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("s.yaml", "s.json"):
+                filename = os.path.join(directory, name)
+                with open(filename, 'w') as file:
+                    file.write(dump_session(data, filename))
+                loaded = load_session_file(filename)
+                self.assertEqual({key: value for key, value in loaded.items() if key in data}, data)
+        self.assertEqual(load_yaml(dump_yaml(data)), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from persistence import AutoSaveEngine, open_session
+from serialization import dump_session
+from session import RackSession
+
+
+def write_session(directory, name, data, corrupt=None):
+    filename = os.path.join(directory, name)
+    text = dump_session(data, filename)
+    if corrupt:
+        text = text.replace(*corrupt)
+    with open(filename, 'w') as file:
+        file.write(text)
+    return filename
+
+
+def loaded(filename):
+    session = RackSession(AutoSaveEngine(filename + ".autosave"))
+    saved = open_session(filename)
+    session.rack_var = saved.header()['rack_var']
+    session.loaded_session = saved
+    session.deferred_sections = {'notes', 'outputs'}
+    return session
+
+
+DATA = {'rack_var': "a01-sr01-rk07", 'progress': {'Cable': 3},
+        'user_notes': {'Cable': "label both ends"}, 'u2_info_yaml': "x: 1\n", 'u2_bmc_yaml': "bmc: {}\n"}
+
+
+class DeferredSectionTest(unittest.TestCase):
+    def test_sections_load_on_demand(self):
+        with tempfile.TemporaryDirectory() as directory:
+            session = loaded(write_session(directory, "s.yaml", DATA))
+            self.assertTrue(session.load_deferred('notes'))
+            self.assertEqual(session.user_notes, {'Cable': "label both ends"})
+            save_data = session.save_data("v1")
+            self.assertEqual(save_data['u2_info_yaml'], "x: 1\n")
+            self.assertIsNone(session.loaded_session)
+
+    def test_malformed_section_is_kept_and_blocks_saving(self):
+        for name, corrupt in (("s.yaml", ("label both ends", "[label: {both")), ("s.json", ('"label both ends"}', '"label'))):
+            with tempfile.TemporaryDirectory() as directory:
+                session = loaded(write_session(directory, name, DATA, corrupt))
+                self.assertFalse(session.load_deferred('notes'))
+                self.assertEqual(session.deferred_sections, {'notes', 'outputs'})
+                self.assertFalse(session.can_save())
+                # Nothing gets written over the notes that didn't parse
+                with self.assertRaises(ValueError):
+                    session.save_data("v1")
+                # The other sections still load
+                self.assertEqual(session.deferred_sections, {'notes'})
+                self.assertEqual(session.u2_bmc_yaml_str, "bmc: {}\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
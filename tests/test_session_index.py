@@ -0,0 +1,49 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from checklist import CatalogStore
+from serialization import dump_session, dump_yaml
+from session_index import INDEX_FILENAME, SessionIndex
+
+
+def write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as file:
+        file.write(text)
+    return path
+
+
+class RebuildTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        store = CatalogStore(os.path.join(self.directory, "step-catalog"))
+        store.put("v1", {'Cable': ["a", "b"], 'Power': ["c", "d"]})
+        self.index = SessionIndex(os.path.join(self.directory, INDEX_FILENAME), store)
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_non_sessions_are_skipped_once(self):
+        session = {'sys_var': "SYS1", 'rack_var': "a01-sr01-rk07", 'mtm_var': "SR650", 'checklist_version': "v1",
+                   'progress': {'Cable': 3, 'Power': 1}}
+        write(self.directory, "SYS1-a01-sr01-rk07.yaml", dump_session(session, "x.yaml"))
+        write(self.directory, "steps.yaml", dump_yaml({'steps': {'Cable': ["a", "b"]}}))
+        write(self.directory, "bench-results.json", json.dumps({'results': {}}, indent=2))
+        broken = write(self.directory, "broken.yaml", "progress: [\n")
+
+        self.assertEqual(self.index.rebuild(self.directory), (1, 0, 2, 1))
+        rows = self.index.search("rk07")
+        self.assertEqual([(row['sys'], row['completion']) for row in rows], [("SYS1", 0.75)])
+
+        # Nothing changed, nothing is parsed again
+        with mock.patch('session_index.open_session', side_effect=AssertionError("parsed again")):
+            self.assertEqual(self.index.rebuild(self.directory), (0, 0, 2, 1))
+
+        os.remove(broken)
+        self.assertEqual(self.index.rebuild(self.directory), (0, 1, 2, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from topology import TopologyRegistry, load_topologies
+
+
+class TopologyTest(unittest.TestCase):
+    def test_defaults_match_the_classic_2u_layout(self):
+        classic = [slot for slot in range(2, 51, 2) if slot not in {22, 24, 26}][:22]
+        topology = TopologyRegistry().get("SR650")
+        self.assertEqual(list(topology.slots), classic)
+        self.assertEqual(topology.hosts("a01-sr01-rk07")[:2], ("a01-sr01-rk07-s02", "a01-sr01-rk07-s04"))
+        names = topology.rack_names({'rack': "a01-sr01-rk07", 'r': "07", 'sr': "01", 'plain_rack': "rk07"})
+        self.assertEqual(names, {'mtor': "r07-mtor", 'tor': "r07-tor", 'pdu': "r07pdu", 'bmc': "r07bmc", 'server': "r07s"})
+
+    def test_slot_ranges(self):
+        registry = TopologyRegistry({'mtm': {
+            'STEPPED': {'slots': [[2, 50, 2]], 'exclude': [], 'max_hosts': None},
+            'TWO_RANGES': {'u_height': 1, 'slots': [[1, 4], [10, 12]], 'exclude': [2], 'max_hosts': 5},
+        }})
+        self.assertEqual(registry.get('STEPPED').slots, tuple(range(2, 51, 2)))
+        self.assertEqual(registry.get('TWO_RANGES').slots, (1, 3, 4, 10, 11))
+        self.assertIs(registry.get('UNKNOWN'), registry.default)
+
+    def test_bad_ranges_are_rejected(self):
+        for slots in ([[1, 2, 3, 4]], [[5]], [[1, 10, 0]]):
+            with self.assertRaises(ValueError):
+                TopologyRegistry({'defaults': {'slots': slots}})
+
+    def test_unknown_pattern_fields_are_reported(self):
+        registry = TopologyRegistry({'mtm': {'X': {'names': {'mtor': "{row}-mtor"}}}})
+        self.assertEqual(registry.problems, ["mtm X: names.mtor: undefined placeholder {row}"])
+        self.assertEqual(registry.get('X').rack_names({'r': "07"})['mtor'], "{row}-mtor")
+
+    def test_broken_file_falls_back_to_defaults(self):
+        for text in ("mtm: [\n", "defaults:\n  slots: [[2, 50, 0]]\n", "- just a list\n"):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "topology.yaml")
+                with open(path, 'w') as file:
+                    file.write(text)
+                output = StringIO()
+                with redirect_stdout(output):
+                    registry = load_topologies(path)
+                self.assertEqual(registry.default.slots, TopologyRegistry().default.slots)
+                self.assertIn("falling back to the default layout", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
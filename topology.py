@@ -0,0 +1,142 @@
+"""Rack layouts per MTM, read from topology.yaml next to steps.yaml.
+
+    defaults:                 # used for any MTM not listed below
+      u_height: 2
+      slots: [[2, 50]]        # inclusive ranges, stepped by u_height
+      exclude: [22, 24, 26]   # switch/PDU positions
+      max_hosts: 22
+      host: "{rack}-s{slot:02d}"
+      names:
+        mtor: "r{r}-mtor"
+        tor: "r{r}-tor"
+        pdu: "r{r}pdu"
+        bmc: "r{r}bmc"
+        server: "r{r}s"
+    mtm:
+      SYS-1029U-TN10RT:
+        u_height: 1
+        slots: [[1, 20], [27, 42]]
+        max_hosts: 36
+
+Each MTM entry only overrides what differs from the defaults. Without a
+topology.yaml the built-in defaults reproduce the classic 2U layout. A slot
+range is [first, last] or [first, last, step]. Host patterns can use {rack}
+and {slot}; name patterns {rack}, {r} (the rkNN digits), {sr} and
+{plain_rack}. Patterns are compiled when the file is loaded; unknown fields
+are reported then and left in the names as the raw placeholder.
+"""
+import os
+from functools import lru_cache
+import yaml
+from checklist import compile_template, render_template
+from serialization import load_yaml
+
+HOST_FIELDS = ('rack', 'slot')
+NAME_FIELDS = ('rack', 'r', 'sr', 'plain_rack')
+
+DEFAULT_TOPOLOGY = {
+    'u_height': 2,
+    'slots': [[2, 50]],
+    'exclude': [22, 24, 26],
+    'max_hosts': 22,
+    'host': "{rack}-s{slot:02d}",
+    'names': {
+        'mtor': "r{r}-mtor",
+        'tor': "r{r}-tor",
+        'pdu': "r{r}pdu",
+        'bmc': "r{r}bmc",
+        'server': "r{r}s",
+    },
+}
+
+
+class Topology:
+    """One compiled rack layout: the slot list is worked out once, host names per rack are cached."""
+
+    def __init__(self, config, label="defaults"):
+        self.u_height = int(config.get('u_height', 1))
+        self.problems = []
+        self.host_pattern = self.compile(label, 'host', config['host'], HOST_FIELDS)
+        self.names = {name: self.compile(label, f"names.{name}", pattern, NAME_FIELDS)
+                      for name, pattern in (config.get('names') or {}).items()}
+        excluded = set(config.get('exclude') or [])
+        max_hosts = config.get('max_hosts')
+
+        slots = []
+        for slot_range in config.get('slots') or []:
+            if not isinstance(slot_range, (list, tuple)) or len(slot_range) not in (2, 3):
+                raise ValueError(f"{label}: slot range {slot_range!r} must be [first, last] or [first, last, step]")
+            first, last = int(slot_range[0]), int(slot_range[1])
+            step = int(slot_range[2]) if len(slot_range) == 3 else self.u_height
+            if step < 1:
+                raise ValueError(f"{label}: slot range {slot_range!r} needs a step of at least 1")
+            slots.extend(slot for slot in range(first, last + 1, step) if slot not in excluded)
+        if max_hosts is not None:
+            slots = slots[:int(max_hosts)]
+        self.slots = tuple(slots)
+        self.hosts = lru_cache(maxsize=4096)(self.build_hosts)
+
+    def compile(self, label, key, pattern, fields):
+        segments, problems = compile_template(str(pattern), fields)
+        # (key, message) pairs, so the registry can tell which patterns an MTM set itself
+        self.problems += [(key, f"{label}: {key}: {problem}") for problem in problems]
+        return segments
+
+    def build_hosts(self, rack):
+        segments = self.host_pattern
+        return tuple(render_template(segments, {'rack': rack, 'slot': slot}) for slot in self.slots)
+
+    def rack_names(self, fields):
+        return {name: render_template(segments, fields) for name, segments in self.names.items()}
+
+
+def merge(base, override):
+    merged = dict(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+class TopologyRegistry:
+    def __init__(self, config=None):
+        config = config or {}
+        defaults = merge(DEFAULT_TOPOLOGY, config.get('defaults'))
+        self.default = Topology(defaults)
+        self.by_mtm = {}
+        self.problems = [problem for _, problem in self.default.problems]
+        for mtm, override in (config.get('mtm') or {}).items():
+            override = override or {}
+            topology = self.by_mtm[str(mtm)] = Topology(merge(defaults, override), f"mtm {mtm}")
+            # Patterns inherited from the defaults were reported with them
+            own = {'host'} if 'host' in override else set()
+            own.update(f"names.{name}" for name in override.get('names') or {})
+            self.problems += [problem for key, problem in topology.problems if key in own]
+
+    def get(self, mtm):
+        return self.by_mtm.get(mtm, self.default) if isinstance(mtm, str) else self.default
+
+    def mtms(self):
+        return list(self.by_mtm)
+
+
+@lru_cache(maxsize=None)
+def load_topologies(path="topology.yaml"):
+    if not os.path.exists(path):
+        return TopologyRegistry()
+    try:
+        with open(path, 'r') as file:
+            registry = TopologyRegistry(load_yaml(file))
+    except (OSError, yaml.YAMLError, ValueError, TypeError, KeyError, AttributeError) as e:
+        # A broken topology.yaml means the built-in layout, not a failed start
+        print(f"Could not use {path}, falling back to the default layout: {str(e)}")
+        return TopologyRegistry()
+    for problem in registry.problems:
+        print(f"{path}: {problem}")
+    return registry
+
+
+def topology_for(mtm):
+    return load_topologies().get(mtm)
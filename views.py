@@ -0,0 +1,348 @@
+import time
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QAbstractListModel, QEvent, QModelIndex, QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QTextDocument
+from PyQt5.QtWidgets import QApplication, QDialog, QLabel, QLineEdit, QListWidget, QListWidgetItem, QPlainTextEdit, QVBoxLayout
+
+
+class OutputPane(QPlainTextEdit):
+    """Read-only view of a generated document that renders only when shown.
+
+    invalidate() just bumps a version stamp; the text is pulled from source()
+    the next time the pane becomes visible (its tab is selected), and long
+    documents are fed in a block of lines per event loop pass."""
+
+    chunk_lines = 2000
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.source = source
+        self.version = 0
+        self.rendered = -1
+
+    def invalidate(self):
+        self.version += 1
+        if self.isVisible():
+            self.render()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.render()
+
+    def render(self):
+        if self.rendered == self.version:
+            return
+        self.rendered = self.version
+        lines = self.source().split('\n')
+        self.setPlainText('\n'.join(lines[:self.chunk_lines]))
+        if len(lines) > self.chunk_lines:
+            self.schedule_chunk(self.version, lines, self.chunk_lines)
+
+    def schedule_chunk(self, version, lines, start):
+        QTimer.singleShot(0, lambda: self.load_chunk(version, lines, start))
+
+    def load_chunk(self, version, lines, start):
+        if version != self.version:
+            return  # A newer render took over
+        end = start + self.chunk_lines
+        self.appendPlainText('\n'.join(lines[start:end]))
+        if end < len(lines):
+            self.schedule_chunk(version, lines, end)
+
+
+class NoteDocumentCache:
+    """Keeps a QTextDocument per recently viewed step and copies its text back
+    into the notes dict only when asked to, instead of on every keystroke."""
+
+    def __init__(self, notes, on_dirty, parent=None, capacity=32):
+        self.notes = notes
+        self.on_dirty = on_dirty
+        self.parent = parent
+        self.capacity = capacity
+        self.documents = OrderedDict()
+        self.dirty = set()
+        self.current = None
+
+    def document(self, step_name):
+        doc = self.documents.get(step_name)
+        if doc is None:
+            doc = QTextDocument(self.parent)
+            doc.setPlainText(self.notes.get(step_name) or "")
+            doc.contentsChange.connect(lambda *_, step=step_name: self.mark_dirty(step))
+            self.documents[step_name] = doc
+        self.documents.move_to_end(step_name)
+        self.current = step_name
+        self.evict()
+        return doc
+
+    def mark_dirty(self, step_name):
+        self.dirty.add(step_name)
+        self.on_dirty(step_name)
+
+    def capture(self):
+        """Copies dirty documents back into notes, returns the steps that changed."""
+        captured = list(self.dirty)
+        for step_name in captured:
+            doc = self.documents.get(step_name)
+            if doc is not None:
+                self.notes[step_name] = doc.toPlainText()
+        self.dirty.clear()
+        return captured
+
+    def evict(self):
+        while len(self.documents) > self.capacity:
+            step_name = next(iter(self.documents))
+            if step_name == self.current:
+                break
+            doc = self.documents.pop(step_name)
+            if step_name in self.dirty:
+                self.notes[step_name] = doc.toPlainText()
+                self.dirty.discard(step_name)
+            doc.deleteLater()
+
+    def reset(self, notes):
+        # Drop every cached document, e.g. after loading a session
+        for doc in self.documents.values():
+            doc.deleteLater()
+        self.documents.clear()
+        self.dirty.clear()
+        self.current = None
+        self.notes = notes
+
+
+class MainStepListModel(QAbstractListModel):
+    """Main steps, handed to the view in batches as it scrolls.
+
+    Completed steps are struck out through the font role, nothing per item is stored."""
+
+    batch_size = 100
+
+    def __init__(self, checklist, parent=None):
+        super().__init__(parent)
+        self.checklist = checklist
+        self.names = list(checklist.steps)
+        self.loaded = 0
+        self.fonts = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.names)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self.names) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        main_step = self.names[index.row()]
+        if role == Qt.DisplayRole:
+            return main_step
+        if role == Qt.FontRole:
+            if self.fonts is None:
+                struck = QFont()
+                struck.setStrikeOut(True)
+                self.fonts = (QFont(), struck)
+            return self.fonts[self.checklist.is_complete(main_step)]
+        return None
+
+    def step_changed(self, main_step):
+        row = self.checklist.row(main_step)
+        if row < self.loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.FontRole])
+
+    def refresh(self):
+        if self.loaded:
+            self.dataChanged.emit(self.index(0), self.index(self.loaded - 1), [Qt.FontRole])
+
+
+class SubStepListModel(QAbstractListModel):
+    """Sub-steps of the selected main step, backed by the checklist's checkbox states.
+
+    Switching main steps just resets the row range, no widgets are created."""
+
+    sub_step_toggled = pyqtSignal(str, int, int)  # main step, index, Qt.CheckState
+
+    def __init__(self, checklist, parent=None):
+        super().__init__(parent)
+        self.checklist = checklist
+        self.main_step = None
+        self.sub_steps = []
+
+    def set_main_step(self, main_step):
+        self.beginResetModel()
+        self.main_step = main_step
+        self.sub_steps = self.checklist.steps.get(main_step, []) if main_step is not None else []
+        self.endResetModel()
+
+    def refresh(self):
+        # States were replaced wholesale, e.g. by loading a session
+        self.set_main_step(self.main_step)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.sub_steps)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.sub_steps[index.row()]
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.checklist.states[self.main_step][index.row()] else Qt.Unchecked
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        self.sub_step_toggled.emit(self.main_step, index.row(), int(value))
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+
+class SessionFinder(QDialog):
+    """Search box over the session index; every keystroke is one indexed query."""
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Find session")
+        self.resize(720, 420)
+        self.index = index
+        self.selected_path = None
+
+        self.search_input = QLineEdit(self)
+        self.search_input.setPlaceholderText("Rack, SYS ticket or MTM")
+        self.search_input.textChanged.connect(self.refresh)
+        self.results = QListWidget(self)
+        self.results.itemActivated.connect(self.open_item)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.results)
+        self.refresh("")
+
+    def refresh(self, text):
+        self.results.clear()
+        for row in self.index.search(text.strip()):
+            item = QListWidgetItem(f"{row['rack']}  {row['sys']}  {row['mtm']}  {row['completion'] * 100:.0f}%")
+            item.setToolTip(row['path'])
+            item.setData(Qt.UserRole, row['path'])
+            self.results.addItem(item)
+
+    def open_item(self, item):
+        self.selected_path = item.data(Qt.UserRole)
+        self.accept()
+
+
+class StallWatchdog(QObject):
+    """Measures event loop lag: a timer that should fire every interval_ms
+    records how late it actually was. Anything past a frame means the UI froze."""
+
+    def __init__(self, profiler, parent=None, interval_ms=50):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.interval = interval_ms / 1000
+        self.last = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self):
+        now = time.perf_counter()
+        self.profiler.record('event loop lag', max(0.0, now - self.last - self.interval))
+        self.last = now
+
+
+class FirstPaint(QObject):
+    """Calls callback once, after the first frame of window has been painted.
+
+    Watches the application's paint events rather than the window's own, since
+    the central widget usually covers the whole window and paints for it. The
+    callback is queued from the first paint, so it runs after that paint pass
+    has been flushed to the screen."""
+
+    def __init__(self, window, callback):
+        super().__init__(window)
+        self.window = window
+        self.callback = callback
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if (self.callback is not None and event.type() == QEvent.Paint
+                and obj.isWidgetType() and obj.window() is self.window):
+            QApplication.instance().removeEventFilter(self)
+            QTimer.singleShot(0, self.callback)
+            self.callback = None
+        return False
+
+
+class PerfOverlay(QLabel):
+    """Monospace p50/p99 table drawn over the top right corner of its parent."""
+
+    def __init__(self, profiler, parent):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setFont(QFont("Courier New", 8))
+        self.setStyleSheet("background: rgba(0, 0, 0, 190); color: #9f9; padding: 6px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+
+    def refresh(self):
+        self.setText(self.profiler.report())
+        self.adjustSize()
+        self.move(self.parent().width() - self.width() - 8, 8)
+
+
+class BackgroundTask(QObject):
+    """Runs func on a plain thread and hands its result (or exception) back on the UI thread."""
+
+    finished = pyqtSignal(object)
+
+    def __init__(self, func, parent=None):
+        super().__init__(parent)
+        self.func = func
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        try:
+            result = self.func()
+        except Exception as e:
+            result = e
+        self.finished.emit(result)